@@ -4,9 +4,11 @@
 # It is only for educational purposes. DO NOT use it in production.
 
 from pypcs.curve import Fp, Fr, ec_mul, G1Point
-from merlin.merlin_transcript import MerlinTranscript
+from merlin.merlin_transcript import MerlinTranscript, TRANSCRIPT_V1, TRANSCRIPT_V2
 
 from pedersen import PedersenCommitment
+from pypcs.parallel import WorkerPool
+from pypcs.vector import FrVector, inner_product
 
 # WARNING: 
 #   1. For demonstration, we deliberately use an insecure random number 
@@ -15,9 +17,12 @@ from pedersen import PedersenCommitment
 #        
 #      See more here: https://docs.python.org/3/library/secrets.html
 #
-#   2. Challenges are only 1 byte long for simplicity, which is not secure.
+#   2. With a TRANSCRIPT_V1 transcript, challenges are only 1 byte long, 
+#      which is not secure.
 
 import random
+import secrets
+from collections import deque
 
 # Implementation of the BulletproofIPA PCS from the following paper:
 #   Bulletproofs: https://eprint.iacr.org/2017/1066.pdf
@@ -34,7 +39,7 @@ import random
 
 # TODO:
 # - add options for the blinders
-# - add batch proving and verifying
+# - add batch proving
 
 
 IPA_Argument = tuple[int,G1Point, G1Point, G1Point, list[Fr]]
@@ -42,14 +47,30 @@ IPA_Argument = tuple[int,G1Point, G1Point, G1Point, list[Fr]]
 class IPA_PCS:
 
     pcs: PedersenCommitment
+    pool: WorkerPool
 
-    def __init__(self, pcs: PedersenCommitment):
+    def __init__(self, pcs: PedersenCommitment, workers: int | None = None):
         """
         Args:
             pcs: the PedersenCommitment instance to use for the proof
+            workers: the number of processes for the MSMs and the folding 
+                of the generators, None to run in the current process
         """
         self.pcs = pcs
         self.rnd_gen = random.Random("ipa-pcs")
+        self.pool = WorkerPool(workers)
+
+    def close(self):
+        """
+        Shut down the worker processes of the pool, if any were started.
+        """
+        self.pool.close()
+
+    def __enter__(self) -> "IPA_PCS":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
 
     def commit(self, vec_c: list[Fr]) -> tuple[G1Point, Fr]:
         """
@@ -93,92 +114,92 @@ class IPA_PCS:
         U = self.pcs.pp[0][-1]
         H = self.pcs.pp[1]
 
-        tr.append_message(b"a_cm", str(a_cm).encode())
-        tr.append_message(b"vec_b", str(vec_b).encode())
-        tr.append_message(b"c", str(c).encode())
+        tr.append_point(b"a_cm", a_cm)
+        tr.append_scalars(b"vec_b", vec_b)
+        tr.append_scalar(b"c", c)
 
         # Round 1:   gamma <~ Fr 
 
-        # WARN: challenge should be 32 bytes long, here we use 1 byte for debugging
-        gamma = Fr.from_bytes(tr.challenge_bytes(b"gamma", 1))
+        gamma = tr.challenge_scalar(b"gamma")
 
         Ugamma = ec_mul(U, gamma)
         P = a_cm + ec_mul(Ugamma, c)
-        PLR = []
+        PLR = deque()
         rho = rho_a
 
-        def recursive_split_and_fold(G: list[G1Point], vec_a: list[Fr], vec_b: list[Fr], rho: Fr, P: G1Point) -> IPA_Argument:
-            if len(vec_a) == 1:
-                assert len(vec_a) == len(vec_b) == len(G) == 1, "EROR: len(vec_a) and len(vec_b) should be 1"
-                a0 = vec_a[0]
-                b0 = vec_b[0]
-                G0 = G[0]
-
-                # Round 4:  R -> 
-                G_new = G0 + ec_mul(Ugamma, b0)
-                r, rho_r = Fr.rands(rng, 2)
-                R = ec_mul(G_new, r) + ec_mul(H, rho_r)
-                tr.append_message(b"R", str(R).encode())
-
-                # Round 5:  zeta <~ Fr
-                zeta = Fr.from_bytes(tr.challenge_bytes(b"zeta", 1))
-                if debug:
-                    print(f"prove> zeta: {zeta}")
+        # Fold in place: after each round, only the first `half` entries of 
+        #   the buffers are live, and the tails are released.
+        G = list(G)
+        vec_a = FrVector(vec_a)
+        vec_b = FrVector(vec_b)
 
-                # Round 6:  z ->  
-                z = r + zeta * a0
-                z_r = rho_r + zeta * rho
-            
-                # Debug
-                if debug:
-                    lhs = self.pcs.commit_with_pp([G_new], [z])
-                    rhs = P + ec_mul(G_new, r) + ec_mul(P, zeta)
-                    if lhs == rhs:
-                        print(f"prove> [z]_(G_new) == pcs.commit_with_pp(G, vec_z) ok ")
-                    else:
-                        print(f"prove> Z == pcs.commit_with_pp(G, vec_z) failed ")
-
-                return (n, PLR, R, z, z_r)
-
-            half = len(vec_a) // 2
-            G1 = G[:half]
-            G2 = G[half:]
-            as1 = vec_a[:half]
-            as2 = vec_a[half:]
-            bs1 = vec_b[:half]
-            bs2 = vec_b[half:]
+        half = n // 2
+        while half > 0:
             rho_L, rho_R = Fr.rands(rng, 2)
 
             # Round 2:   PL, PR, ->
-            PL = self.pcs.commit_with_pp(G1, as2) + ec_mul(Ugamma, ipa(as2, bs1)) + ec_mul(H, rho_L)
-            PR = self.pcs.commit_with_pp(G2, as1) + ec_mul(Ugamma, ipa(as1, bs2)) + ec_mul(H, rho_R)
-            PLR.insert(0, (PL, PR))
+            ab_L = vec_a[half:].dot(vec_b[:half])
+            ab_R = vec_a[:half].dot(vec_b[half:])
+            cm_L, cm_R = self.pool.msms([(G[:half], vec_a[half:]), (G[half:], vec_a[:half])])
+            PL = cm_L + ec_mul(Ugamma, ab_L) + ec_mul(H, rho_L)
+            PR = cm_R + ec_mul(Ugamma, ab_R) + ec_mul(H, rho_R)
+            PLR.appendleft((PL, PR))
 
-            tr.append_message(b"PL", str(PL).encode())
-            tr.append_message(b"PR", str(PR).encode())
+            tr.append_point(b"PL", PL)
+            tr.append_point(b"PR", PR)
 
             # Round 3:   mu <~ Fr
-            mu = Fr.from_bytes(tr.challenge_bytes(b"mu", 1))
+            mu = tr.challenge_scalar(b"mu")
             if debug:
                 print(f"prove> mu: {mu}")
-            vec_a = [as1[i] + as2[i] * mu for i in range(half)]
-            vec_b = [bs1[i] + bs2[i] * mu.inv() for i in range(half)]
-            rho += rho_L * mu + rho_R * mu.inv()
-            
-            G = [G1[i] + ec_mul(G2[i], mu.inv()) for i in range(half)]
+            mu_inv = mu.inv()
+            vec_a.fold(mu, inplace=True)
+            vec_b.fold(mu_inv, inplace=True)
+            G[:half] = self.pool.fold(G, half, mu_inv)
+            del G[half:]
+            rho += rho_L * mu + rho_R * mu_inv
 
             # Debug
             if debug:
                 lhs = self.pcs.commit_with_pp(G, vec_a) + ec_mul(Ugamma, ipa(vec_a, vec_b)) + ec_mul(H, rho)
-                P += ec_mul(PL, mu) + ec_mul(PR, mu.inv())
+                P += ec_mul(PL, mu) + ec_mul(PR, mu_inv)
                 if lhs == P:
                     print(f"prove> [vec_a]_(G) + [<vec_a, vec_b>]_(H) == P + mu*PL + mu^(-1)*PR ok ")
                 else:
                     print(f"prove> [vec_a]_(G) + [<vec_a, vec_b>]_(H) == P + mu*PL + mu^(-1)*PR failed ")
-            
-            return recursive_split_and_fold(G, vec_a, vec_b, rho, P)
-        
-        return recursive_split_and_fold(G, vec_a, vec_b, rho, P)
+
+            half = half // 2
+
+        assert len(vec_a) == len(vec_b) == len(G) == 1, "EROR: len(vec_a) and len(vec_b) should be 1"
+        a0 = vec_a[0]
+        b0 = vec_b[0]
+        G0 = G[0]
+
+        # Round 4:  R -> 
+        G_new = G0 + ec_mul(Ugamma, b0)
+        r, rho_r = Fr.rands(rng, 2)
+        R = ec_mul(G_new, r) + ec_mul(H, rho_r)
+        tr.append_point(b"R", R)
+
+        # Round 5:  zeta <~ Fr
+        zeta = tr.challenge_scalar(b"zeta")
+        if debug:
+            print(f"prove> zeta: {zeta}")
+
+        # Round 6:  z ->  
+        z = r + zeta * a0
+        z_r = rho_r + zeta * rho
+    
+        # Debug
+        if debug:
+            lhs = self.pcs.commit_with_pp([G_new], [z])
+            rhs = P + ec_mul(G_new, r) + ec_mul(P, zeta)
+            if lhs == rhs:
+                print(f"prove> [z]_(G_new) == pcs.commit_with_pp(G, vec_z) ok ")
+            else:
+                print(f"prove> Z == pcs.commit_with_pp(G, vec_z) failed ")
+
+        return (n, list(PLR), R, z, z_r)
 
     def inner_product_extract(self, \
             a_cm: G1Point, vec_b: list[Fr], c: Fr, vec_a: list[Fr], rho_a: Fr, \
@@ -214,21 +235,28 @@ class IPA_PCS:
         U = self.pcs.pp[0][-1]
         H = self.pcs.pp[1]
 
-        tr.append_message(b"a_cm", str(a_cm).encode())
-        tr.append_message(b"vec_b", str(vec_b).encode())
-        tr.append_message(b"c", str(c).encode())
+        tr.append_point(b"a_cm", a_cm)
+        tr.append_scalars(b"vec_b", vec_b)
+        tr.append_scalar(b"c", c)
 
         # Round 1:   gamma <~ Fr 
 
-        # WARN: challenge should be 32 bytes long, here we use 1 byte for debugging
-        gamma = Fr.from_bytes(tr.challenge_bytes(b"gamma", 1))
+        gamma = tr.challenge_scalar(b"gamma")
 
         Ugamma = ec_mul(U, gamma)
         P = a_cm + ec_mul(Ugamma, c)
-        PLR = []
-        rho = rho_a
 
-        def recursive_split_and_fold(G: list[G1Point], vec_a: list[Fr], vec_b: list[Fr], rho: Fr, P: G1Point) -> list[Fr]:
+        # The extractor rewinds every round with a second challenge mu_star, 
+        #   which makes a binary tree of executions. It is walked depth-first 
+        #   with an explicit stack of frames [G, vec_a, vec_b, rho, stage, saved],
+        #   where stage 0 runs the round with mu, stage 1 rewinds with mu_star, 
+        #   and stage 2 combines the two extracted vectors of the children.
+        stack = [[G, vec_a, vec_b, rho_a, 0, None]]
+        extracted = []
+        while len(stack) > 0:
+            frame = stack[-1]
+            G, vec_a, vec_b, rho, stage, saved = frame
+
             if len(vec_a) == 1:
                 assert len(vec_a) == len(vec_b) == len(G) == 1, "EROR: len(vec_a) and len(vec_b) should be 1"
                 a0 = vec_a[0]
@@ -239,10 +267,10 @@ class IPA_PCS:
                 G_new = G0 + ec_mul(Ugamma, b0)
                 r, rho_r = Fr.rands(rng, 2)
                 R = ec_mul(G_new, r) + ec_mul(H, rho_r)
-                tr.append_message(b"R", str(R).encode())
+                tr.append_point(b"R", R)
 
                 # Round 5:  zeta <~ Fr
-                zeta = Fr.from_bytes(tr.challenge_bytes(b"zeta", 1))
+                zeta = tr.challenge_scalar(b"zeta")
                 zeta_star = Fr.rand(rng)
 
                 # Round 6:  z ->  
@@ -250,61 +278,169 @@ class IPA_PCS:
                 
                 z_star = r + zeta_star * a0
 
-                extracted_vec_a = [(z - z_star) / (zeta - zeta_star)]
-            
-                return extracted_vec_a
+                stack.pop()
+                extracted.append([(z - z_star) / (zeta - zeta_star)])
+                continue
 
             half = len(vec_a) // 2
-            G1 = G[:half]
-            G2 = G[half:]
-            as1 = vec_a[:half]
-            as2 = vec_a[half:]
-            bs1 = vec_b[:half]
-            bs2 = vec_b[half:]
-            rho_L, rho_R = Fr.rands(rng, 2)
+            if stage == 0:
+                rho_L, rho_R = Fr.rands(rng, 2)
 
-            # Round 2:   PL, PR, ->
-            PL = self.pcs.commit_with_pp(G1, as2) + ec_mul(Ugamma, ipa(as2, bs1)) + ec_mul(H, rho_L)
-            PR = self.pcs.commit_with_pp(G2, as1) + ec_mul(Ugamma, ipa(as1, bs2)) + ec_mul(H, rho_R)
-            PLR.insert(0, (PL, PR))
+                # Round 2:   PL, PR, ->
+                PL = self.pcs.commit_with_pp(G[:half], vec_a[half:]) + ec_mul(Ugamma, ipa(vec_a[half:], vec_b[:half])) + ec_mul(H, rho_L)
+                PR = self.pcs.commit_with_pp(G[half:], vec_a[:half]) + ec_mul(Ugamma, ipa(vec_a[:half], vec_b[half:])) + ec_mul(H, rho_R)
 
-            tr.append_message(b"PL", str(PL).encode())
-            tr.append_message(b"PR", str(PR).encode())
+                tr.append_point(b"PL", PL)
+                tr.append_point(b"PR", PR)
+
+                # Round 3:   mu <~ Fr
+                mu = tr.challenge_scalar(b"mu")
+                if debug:
+                    print(f"prove> mu: {mu}")
+                mu_inv = mu.inv()
+                rho += rho_L * mu + rho_R * mu_inv
+                frame[3], frame[4], frame[5] = rho, 1, (mu, rho_L, rho_R)
+                stack.append([
+                    [G[i] + ec_mul(G[half + i], mu_inv) for i in range(half)],
+                    [vec_a[i] + vec_a[half + i] * mu for i in range(half)],
+                    [vec_b[i] + vec_b[half + i] * mu_inv for i in range(half)],
+                    rho, 0, None])
+            elif stage == 1:
+                mu, rho_L, rho_R = saved
+                mu_star = Fr.rand(rng)
+                mu_star_inv, delta_inv = Fr.batch_inv([mu_star, mu - mu_star])
+                rho += rho_L * mu_star + rho_R * mu_star_inv
+                frame[3], frame[4], frame[5] = rho, 2, (mu, mu_star, delta_inv)
+                stack.append([
+                    [G[i] + ec_mul(G[half + i], mu_star_inv) for i in range(half)],
+                    [vec_a[i] + vec_a[half + i] * mu_star for i in range(half)],
+                    [vec_b[i] + vec_b[half + i] * mu_star_inv for i in range(half)],
+                    rho, 0, None])
+            else:
+                mu, mu_star, delta_inv = saved
+                extracted_vec_a_star = extracted.pop()
+                extracted_vec_a = extracted.pop()
+                extracted_as2 = [(a - a_star) * delta_inv for a, a_star in zip(extracted_vec_a, extracted_vec_a_star)]
+                extracted_as1 = [(a_star * mu - a * mu_star) * delta_inv for a, a_star in zip(extracted_vec_a, extracted_vec_a_star)]
+                stack.pop()
+                extracted.append(extracted_as1 + extracted_as2)
+
+        return extracted.pop()
+
+    def replay_challenges(self, a_cm: G1Point, vec_b: list[Fr], c: Fr, arg: IPA_Argument, tr: MerlinTranscript, debug=False) \
+            -> tuple[Fr, list[Fr], Fr]:
+        """
+        Replay the verifier side of the transcript of an inner product argument.
+
+        Args:
+            a_cm: the commitment to the vector a
+            vec_b: the vector b
+            c: the challenge scalar
+            arg: the IPA_Argument (proof transcript)
+            tr: the Merlin transcript to use for the proof
+            debug: whether to print debug information
+        Returns:
+            the challenges (gamma, [mu_0, mu_1, ..., mu_{k-1}], zeta)
+        """
+        n, PLR, R, z, z_r = arg
+
+        tr.append_point(b"a_cm", a_cm)
+        tr.append_scalars(b"vec_b", vec_b)
+        tr.append_scalar(b"c", c)
+
+        # Round 1:   gamma <~ Fr 
+
+        gamma = tr.challenge_scalar(b"gamma")
+        if debug:
+            print(f"verify> gamma: {gamma}")
+
+        # Round 2:   PL, PR, ->
+        mus = []
+        for PL, PR in reversed(PLR):
+            tr.append_point(b"PL", PL)
+            tr.append_point(b"PR", PR)
 
             # Round 3:   mu <~ Fr
-            mu = Fr.from_bytes(tr.challenge_bytes(b"mu", 1))
+            mu = tr.challenge_scalar(b"mu")
             if debug:
-                print(f"prove> mu: {mu}")
-            vec_a = [as1[i] + as2[i] * mu for i in range(half)]
-            vec_b = [bs1[i] + bs2[i] * mu.inv() for i in range(half)]
-            rho += rho_L * mu + rho_R * mu.inv()
-            
-            G = [G1[i] + ec_mul(G2[i], mu.inv()) for i in range(half)]
-            
-            extracted_vec_a = recursive_split_and_fold(G, vec_a, vec_b, rho, P)
-            
-            mu_star = Fr.rand(rng)
-            vec_a = [as1[i] + as2[i] * mu_star for i in range(half)]
-            vec_b = [bs1[i] + bs2[i] * mu_star.inv() for i in range(half)]
-            rho += rho_L * mu_star + rho_R * mu_star.inv()
-            
-            G = [G1[i] + ec_mul(G2[i], mu_star.inv()) for i in range(half)]
-
-            extracted_vec_a_star = recursive_split_and_fold(G, vec_a, vec_b, rho, P)
-            
-            extracted_as2 = [(a - a_star) / (mu - mu_star) for a, a_star in zip(extracted_vec_a, extracted_vec_a_star)]
-            extracted_as1 = [(a * mu_star - a_star * mu) / (mu_star - mu) for a, a_star in zip(extracted_vec_a, extracted_vec_a_star)]
-            
-            return extracted_as1 + extracted_as2
-
-        return recursive_split_and_fold(G, vec_a, vec_b, rho, P)
-
-    def inner_product_verify(self, a_cm: G1Point, vec_b: Fr, c: Fr, arg: IPA_Argument, tr: MerlinTranscript, debug=False) -> bool:
+                print(f"verify> mu: {mu}")
+            mus.append(mu)
+
+        # Round 4:  R -> 
+        tr.append_point(b"R", R)
+
+        # Round 5:  zeta <~ Fr
+        zeta = tr.challenge_scalar(b"zeta")
+        if debug:
+            print(f"verify> zeta: {zeta}")
+
+        return gamma, mus, zeta
+
+    def well_formed(self, arg: IPA_Argument) -> bool:
+        """
+        Check the shape of an inner product argument: n must be a power of 2 
+        within the generators, with one (PL, PR) pair per round.
+
+        Only the argument itself is looked at, so this is cheap even when n 
+        is not, and must run before anything of size n is built.
+        """
+        if not isinstance(arg, tuple) or len(arg) != 5:
+            return False
+        n, PLR, R, z, z_r = arg
+        if not isinstance(n, int) or n <= 0 or n & (n - 1) != 0 or n >= len(self.pcs.pp[0]):
+            return False
+        return isinstance(PLR, list) and len(PLR) == n.bit_length() - 1
+
+    def msm_check_terms(self, a_cm: G1Point, vec_b: list[Fr], c: Fr, arg: IPA_Argument, \
+            gamma: Fr, mus: list[Fr], mu_invs: list[Fr], zeta: Fr) -> tuple[list[G1Point], list[Fr]]:
+        """
+        Unroll the final check of an inner product argument into one 
+        multi-scalar multiplication that must sum to zero.
+
+        After k rounds of folding, the generator and the vector b are
+
+            G0 = sum_i s_i * G_i,   b0 = sum_i s_i * b_i
+
+        where s_i is the product of mu_j^{-1} over the rounds j at which 
+        G_i is in the right half. The check of Round 6
+
+            [z](G0 + [b0 * gamma]U) + [z_r]H = R + [zeta](P)
+            P = a_cm + [c * gamma]U + sum_j ([mu_j]PL_j + [mu_j^{-1}]PR_j)
+
+        then becomes a linear combination of G_0, ..., G_{n-1}, U, H, a_cm, 
+        R and all the PL_j, PR_j.
+
+        Returns:
+            the points and the scalars of the multi-scalar multiplication
+        """
+        n, PLR, R, z, z_r = arg
+        G = self.pcs.pp[0][:n]
+        U = self.pcs.pp[0][-1]
+        H = self.pcs.pp[1]
+        assert len(G) == len(vec_b) == n, f"EROR: len(vec_b) = {len(vec_b)}, while n = {n}"
+
+        s = s_vector(mu_invs)
+        b0 = ipa(s, vec_b)
+
+        pts = G + [U, H, R, a_cm]
+        coeffs = [z * si for si in s] + [(z * b0 - zeta * c) * gamma, z_r, Fr(-1), -zeta]
+        for (PL, PR), mu, mu_inv in zip(reversed(PLR), mus, mu_invs):
+            pts += [PL, PR]
+            coeffs += [-zeta * mu, -zeta * mu_inv]
+        return pts, coeffs
+
+    def inner_product_verify(self, a_cm: G1Point, vec_b: list[Fr], c: Fr, arg: IPA_Argument, tr: MerlinTranscript, \
+            debug=False, fold=False) -> bool:
         """
         Verify an inner product argument.
 
             <(a0, a1,...,a_{n-1}), (b0, b1,...,b_{n-1})> = c
 
+        By default, all the round challenges are collected first and the 
+        argument is checked with a single multi-scalar multiplication in O(n),
+        see `msm_check_terms`. With fold=True, the generators and the vector b 
+        are folded round by round instead, as the prover does.
+
         Args:
             a_cm: the commitment to the vector a
             vec_b: the vector b
@@ -312,69 +448,43 @@ class IPA_PCS:
             arg: the IPA_UNI_Argument (proof transcript)
             tr: the Merlin transcript to use for the proof
             debug: whether to print debug information
+            fold: whether to verify by folding the generators
         """
 
         n, PLR, R, z, z_r = arg
 
-        tr.append_message(b"a_cm", str(a_cm).encode())
-        tr.append_message(b"vec_b", str(vec_b).encode())
-        tr.append_message(b"c", str(c).encode())
+        gamma, mus, zeta = self.replay_challenges(a_cm, vec_b, c, arg, tr, debug)
+
+        # The challenges of all rounds are inverted together
+        mu_invs = Fr.batch_inv(mus)
+
+        if not fold:
+            pts, coeffs = self.msm_check_terms(a_cm, vec_b, c, arg, gamma, mus, mu_invs, zeta)
+            return self.pool.msm(pts, coeffs) == G1Point.zero()
 
         G = self.pcs.pp[0][:n]
         U = self.pcs.pp[0][-1]
         H = self.pcs.pp[1]
 
-        # Round 1:   gamma <~ Fr 
-
-        # WARN: challenge should be 32 bytes long, here we use 1 byte for debugging
-        gamma = Fr.from_bytes(tr.challenge_bytes(b"gamma", 1))
-        if debug:
-            print(f"verify> gamma: {gamma}")
-
         Ugamma = ec_mul(U, gamma)
         P = a_cm + ec_mul(Ugamma, c)
 
-        # Round 2:   PL, PR, ->
-        round = 0
         half = n // 2
-        while half > 0:
-            PL, PR = PLR.pop()
-
-            tr.append_message(b"PL", str(PL).encode())
-            tr.append_message(b"PR", str(PR).encode())
-
-            # Round 3:   mu <~ Fr
-            mu = Fr.from_bytes(tr.challenge_bytes(b"mu", 1))
-            if debug:
-                print(f"verify> mu: {mu}")
-
-            G1 = G[:half]
-            G2 = G[half:]
+        for (PL, PR), mu, mu_inv in zip(reversed(PLR), mus, mu_invs):
             bs1 = vec_b[:half]
             bs2 = vec_b[half:]
-            G = [G1[i] + ec_mul(G2[i], mu.inv()) for i in range(half)]
-            vec_b = [bs1[i] + mu.inv() * bs2[i] for i in range(half)]
-            
-            # print(f"verify> G[{round}]: {G}")
+            G = self.pool.fold(G, half, mu_inv)
+            vec_b = [bs1[i] + mu_inv * bs2[i] for i in range(half)]
 
             # Z_1 ?= Z + x * AL + x^{-1} * AR
         
-            P += ec_mul(PL, mu) + ec_mul(PR, mu.inv())
+            P += ec_mul(PL, mu) + ec_mul(PR, mu_inv)
             half = half // 2
-            round += 1
         
         assert len(G) == len(vec_b) == 1, "EROR: len(vec_a) and len(vec_b) should be 1"
         G0 = G[0]
         b0 = vec_b[0]
 
-        # Round 4:  R -> 
-        tr.append_message(b"R", str(R).encode())
-
-        # Round 5:  zeta <~ Fr
-        zeta = Fr.from_bytes(tr.challenge_bytes(b"zeta", 1))
-        if debug:
-            print(f"verify> zeta: {zeta}")
-
         # Round 6:  z ->  
         
         G_new = G0 + ec_mul(Ugamma, b0)
@@ -383,6 +493,82 @@ class IPA_PCS:
 
         return lhs == rhs
 
+    def batch_verify(self, instances: list[tuple[G1Point, Fr | list[Fr], Fr, IPA_Argument, MerlinTranscript]], \
+            debug=False) -> list[bool]:
+        """
+        Verify many evaluation arguments at once.
+
+        The final check of every argument is a multi-scalar multiplication 
+        that must sum to zero (see `msm_check_terms`). They are combined with 
+        random weights into one MSM, where the terms of the shared generators 
+        G_i, U and H are merged. If the combined check fails, the batch is 
+        bisected to find the failing arguments.
+
+        Args:
+            instances: a list of (f_cm, point, value, arg, tr), where point is 
+                either x (univariate, f(x) = y) or us (MLE, f(us) = v)
+            debug: whether to print debug information
+        Returns:
+            whether each argument is valid
+        """
+        verified = [True] * len(instances)
+        replayed = []
+        for k, (f_cm, point, value, arg, tr) in enumerate(instances):
+            well_formed = self.well_formed(arg)
+            if well_formed:
+                n = arg[0]
+                vec_b = point if isinstance(point, list) else [point**i for i in range(n)]
+                well_formed = len(vec_b) == n
+            if not well_formed:
+                if debug:
+                    print(f"batch_verify> argument {k} is malformed")
+                verified[k] = False
+                continue
+            gamma, mus, zeta = self.replay_challenges(f_cm, vec_b, value, arg, tr, debug)
+            if any(mu == Fr.zero() for mu in mus):
+                verified[k] = False
+                continue
+            replayed.append((k, f_cm, vec_b, value, arg, gamma, mus, zeta))
+
+        # The challenges of all rounds of all arguments are inverted together
+        mu_invs = Fr.batch_inv([mu for *_, mus, _ in replayed for mu in mus])
+
+        terms = {}
+        offset = 0
+        for k, f_cm, vec_b, value, arg, gamma, mus, zeta in replayed:
+            terms[k] = self.msm_check_terms(f_cm, vec_b, value, arg, gamma, mus, \
+                                            mu_invs[offset:offset + len(mus)], zeta)
+            offset += len(mus)
+
+        def combined_check(indices: list[int]) -> bool:
+            merged = {}
+            for k in indices:
+                weight = Fr(secrets.randbelow(Fr.field_modulus - 1) + 1)
+                pts, coeffs = terms[k]
+                for pt, coeff in zip(pts, coeffs):
+                    if id(pt) in merged:
+                        merged[id(pt)][1] += weight * coeff
+                    else:
+                        merged[id(pt)] = [pt, weight * coeff]
+            pts = [pt for pt, _ in merged.values()]
+            coeffs = [coeff for _, coeff in merged.values()]
+            return self.pool.msm(pts, coeffs) == G1Point.zero()
+
+        def bisect(indices: list[int]):
+            if len(indices) == 0 or combined_check(indices):
+                return
+            if len(indices) == 1:
+                verified[indices[0]] = False
+                return
+            half = len(indices) // 2
+            bisect(indices[:half])
+            bisect(indices[half:])
+
+        bisect(list(terms))
+        if debug:
+            print(f"batch_verify> verified: {verified}")
+        return verified
+
     def univariate_poly_eval_prove(self, \
             f_cm: G1Point, x: Fr, y: Fr, coeffs: list[Fr], rho: Fr, tr: MerlinTranscript, debug=False) \
             -> IPA_Argument:
@@ -490,10 +676,21 @@ class IPA_PCS:
         n, PLR, R, z, z_r = arg
         return self.inner_product_verify(f_cm, us, v, arg, tr, debug)
     
-def ipa(vec_a: list[Fr], vec_b: list[Fr]) -> Fr:
-    n = len(vec_a)
-    assert len(vec_b) == n
-    return sum(a * b for a, b in zip(vec_a, vec_b))
+def ipa(vec_a: list[Fr] | FrVector, vec_b: list[Fr] | FrVector) -> Fr:
+    return inner_product(vec_a, vec_b)
+
+def s_vector(mu_invs: list[Fr]) -> list[Fr]:
+    """
+    Compute the coefficients s_i of the folded generator G0 = sum_i s_i * G_i,
+    given the inverses of the round challenges [mu_0^{-1}, ..., mu_{k-1}^{-1}].
+
+    Round j folds G_i of the right half (bit k-1-j of i is set) with mu_j^{-1},
+    so s_i is the product of mu_j^{-1} over the set bits of i.
+    """
+    s = [Fr.one()]
+    for mu_inv in reversed(mu_invs):
+        s += [si * mu_inv for si in s]
+    return s
 
 def test_ipa_pcs():
 
@@ -521,12 +718,96 @@ def test_ipa_pcs():
     print(f"arg: {arg}")
 
     # verifier verifies the argument
+    tr_verifier_fold = tr_verifier.fork(b"verifier")
     verified = ipa_pcs.univariate_poly_eval_verify(f_cm, x, y, arg, tr_verifier, debug=True)
     print(f"verified: {verified}")
+    assert verified, "univariate polynomial evaluation verification failed"
+
+    # verifier verifies the argument by folding the generators
+    n, PLR, R, z, z_r = arg
+    vec_x = [x**i for i in range(n)]
+    assert ipa_pcs.inner_product_verify(f_cm, vec_x, y, arg, tr_verifier_fold, fold=True)
     
     extracted_coeffs = ipa_pcs.univariate_poly_eval_extract(f_cm, x, y, coeffs, rho, tr_prover, debug=False)
     assert coeffs == extracted_coeffs
     print(f"extracted_coeffs: {extracted_coeffs}")
 
+def test_batch_verify():
+
+    pcs = PedersenCommitment.setup(20)
+    ipa_pcs = IPA_PCS(pcs)
+    tr = MerlinTranscript(b"ipa-pcs-batch")
+    rng = random.Random("test-batch-verify")
+
+    instances = []
+    for k in range(5):
+        coeffs = Fr.rands(rng, 8)
+        rho = Fr.rand(rng)
+        f_cm = pcs.commit_with_blinder(coeffs, rho)
+        x = Fr.rand(rng)
+        y = ipa(coeffs, [x**i for i in range(len(coeffs))])
+        arg = ipa_pcs.univariate_poly_eval_prove(f_cm, x, y, coeffs, rho, tr.fork(b"prover"))
+        # the claimed value of the 4th instance is wrong
+        instances.append((f_cm, x, y if k != 3 else y + Fr(1), arg))
+
+    verified = ipa_pcs.batch_verify([(f_cm, x, y, arg, tr.fork(b"verifier")) for f_cm, x, y, arg in instances])
+    assert verified == [True, True, True, False, True], f"batch_verify: {verified}"
+    assert ipa_pcs.batch_verify([(f_cm, x, y, arg, tr.fork(b"verifier")) for f_cm, x, y, arg in instances[:3]]) == [True] * 3
+
+    # a round of the 2nd argument is dropped
+    n, PLR, R, z, z_r = instances[1][3]
+    instances[1] = instances[1][:3] + ((n, PLR[1:], R, z, z_r),)
+    verified = ipa_pcs.batch_verify([(f_cm, x, y, arg, tr.fork(b"verifier")) for f_cm, x, y, arg in instances])
+    assert verified == [True, False, True, False, True], f"batch_verify: {verified}"
+
+    # the 1st argument claims a non-int n, and the 3rd one a huge n
+    n, PLR, R, z, z_r = instances[0][3]
+    instances[0] = instances[0][:3] + (("8", PLR, R, z, z_r),)
+    n, PLR, R, z, z_r = instances[2][3]
+    instances[2] = instances[2][:3] + ((2**21, PLR, R, z, z_r),)
+    verified = ipa_pcs.batch_verify([(f_cm, x, y, arg, tr.fork(b"verifier")) for f_cm, x, y, arg in instances])
+    assert verified == [False, False, False, False, True], f"batch_verify: {verified}"
+    print("✅ IPA_PCS batch_verify Test Passed")
+
+def test_ipa_pcs_workers():
+
+    pcs = PedersenCommitment.setup(20)
+    tr = MerlinTranscript(b"ipa-pcs-workers")
+    coeffs = [Fr(i + 2) for i in range(8)]
+    x = Fr(4)
+    y = ipa(coeffs, [x**i for i in range(len(coeffs))])
+    rho = Fr.rand()
+    f_cm = pcs.commit_with_blinder(coeffs, rho)
+
+    ipa_pcs = IPA_PCS(pcs)
+    arg = ipa_pcs.univariate_poly_eval_prove(f_cm, x, y, coeffs, rho, tr.fork(b"prover"))
+    with IPA_PCS(pcs, workers=2) as ipa_pcs_par:
+        ipa_pcs_par.pool.min_chunk = 1
+        arg_par = ipa_pcs_par.univariate_poly_eval_prove(f_cm, x, y, coeffs, rho, tr.fork(b"prover"))
+        assert str(arg) == str(arg_par), "the parallel prover must produce the same argument"
+        assert ipa_pcs_par.univariate_poly_eval_verify(f_cm, x, y, arg_par, tr.fork(b"verifier"))
+    print("✅ IPA_PCS with workers Test Passed")
+
+def test_transcript_versions():
+
+    pcs = PedersenCommitment.setup(20)
+    ipa_pcs = IPA_PCS(pcs)
+    rng = random.Random("test-transcript-versions")
+    coeffs = Fr.rands(rng, 8)
+    x = Fr.rand(rng)
+    y = ipa(coeffs, [x**i for i in range(len(coeffs))])
+    rho = Fr.rand(rng)
+    f_cm = pcs.commit_with_blinder(coeffs, rho)
+
+    for version in [TRANSCRIPT_V1, TRANSCRIPT_V2]:
+        tr = MerlinTranscript(b"ipa-pcs-versions", version)
+        arg = ipa_pcs.univariate_poly_eval_prove(f_cm, x, y, coeffs, rho, tr.fork(b"prover"))
+        assert tr.fork(b"prover").version == version
+        assert ipa_pcs.univariate_poly_eval_verify(f_cm, x, y, arg, tr.fork(b"verifier"))
+    print("✅ IPA_PCS transcript versions Test Passed")
+
 if __name__ == "__main__":
-    test_ipa_pcs()
\ No newline at end of file
+    test_ipa_pcs()
+    test_batch_verify()
+    test_ipa_pcs_workers()
+    test_transcript_versions()
\ No newline at end of file
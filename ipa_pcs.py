@@ -7,6 +7,8 @@ from pypcs.curve import Fp, Fr, ec_mul, G1Point
 from merlin.merlin_transcript import MerlinTranscript
 
 from pedersen import PedersenCommitment
+from pypcs.parallel import WorkerPool
+from pypcs.vector import FrVector, inner_product
 
 # WARNING: 
 #   1. For demonstration, we deliberately use an insecure random number 
@@ -15,7 +17,8 @@ from pedersen import PedersenCommitment
 #        
 #      See more here: https://docs.python.org/3/library/secrets.html
 #
-#   2. Challenges are only 1 byte long for simplicity, which is not secure.
+#   2. With a TRANSCRIPT_V1 transcript, challenges are only 1 byte long, 
+#      which is not secure.
 
 import random
 
@@ -42,14 +45,30 @@ IPA_PCS_Argument = tuple[int,G1Point, G1Point, G1Point, list[Fr]]
 class IPA_PCS:
 
     pcs: PedersenCommitment
+    pool: WorkerPool
 
-    def __init__(self, pcs: PedersenCommitment):
+    def __init__(self, pcs: PedersenCommitment, workers: int | None = None):
         """
         Args:
             pcs: the PedersenCommitment instance to use for the proof
+            workers: the number of processes for the MSMs and the folding 
+                of the generators, None to run in the current process
         """
         self.pcs = pcs
         self.rnd_gen = random.Random("ipa-pcs")
+        self.pool = WorkerPool(workers)
+
+    def close(self):
+        """
+        Shut down the worker processes of the pool, if any were started.
+        """
+        self.pool.close()
+
+    def __enter__(self) -> "IPA_PCS":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
 
     def commit(self, vec_c: list[Fr]) -> tuple[G1Point, Fr]:
         """
@@ -57,7 +76,7 @@ class IPA_PCS:
         """
 
         blinder = Fr.rand()
-        return self.pcs.commit(vec_c, blinder), blinder
+        return self.pcs.commit_with_blinder(vec_c, blinder), blinder
     
     def eval_prove(self, f_cm: G1Point, x: Fr, y: Fr, vec_c: list[Fr], rho_c: Fr, tr: MerlinTranscript, debug=False) -> IPA_PCS_Argument:
         """
@@ -77,25 +96,25 @@ class IPA_PCS:
             an IPA_PCS_Argument tuple
         """
         n = len(vec_c)
-        assert len(self.pcs.pp) >= 2 * n + 1, f"EROR: len(pcs.pp) = {len(self.pcs.pp)}, while len(vec_c) = {len(vec_c)}"
+        assert len(self.pcs.pp[0]) >= 2 * n + 1, f"EROR: len(pcs.pp) = {len(self.pcs.pp[0])}, while len(vec_c) = {len(vec_c)}"
         if debug:
             print(f"prove> n: {n}")
         rng = random.Random(b"schnorr-1folding-commit")
 
-        G = self.pcs.pp[:n]
-        H = self.pcs.pp[-2]
-        U = self.pcs.pp[-1]
+        G = self.pcs.pp[0][:n]
+        U = self.pcs.pp[0][-1]
+        H = self.pcs.pp[1]
 
-        tr.append_message(b"f_cm", str(f_cm).encode())
-        tr.append_message(b"x", str(x).encode())
-        tr.append_message(b"y", str(y).encode())
+        tr.append_point(b"f_cm", f_cm)
+        tr.append_scalar(b"x", x)
+        tr.append_scalar(b"y", y)
 
-        vec_x = [x**i for i in range(n)]
+        vec_c = FrVector(vec_c)
+        vec_x = FrVector(x**i for i in range(n))
 
         # Round 1:   gamma <~ Fr 
 
-        # WARN: challenge should be 32 bytes long, here we use 1 byte for debugging
-        gamma = Fr.from_bytes(tr.challenge_bytes(b"gamma", 1))
+        gamma = tr.challenge_scalar(b"gamma")
 
         Ugamma = ec_mul(U, gamma)
         P = f_cm + ec_mul(Ugamma, y)
@@ -118,27 +137,29 @@ class IPA_PCS:
             xs2 = vec_x[half:]
             rho_L, rho_R = Fr.rands(rng, 2)
 
-            PL = self.pcs.commit_with_pp(G1, cs2) + ec_mul(Ugamma, ipa(cs2, xs1)) + ec_mul(H, rho_L)
-            PR = self.pcs.commit_with_pp(G2, cs1) + ec_mul(Ugamma, ipa(cs1, xs2)) + ec_mul(H, rho_R)
+            cm_L, cm_R = self.pool.msms([(G1, cs2), (G2, cs1)])
+            PL = cm_L + ec_mul(Ugamma, ipa(cs2, xs1)) + ec_mul(H, rho_L)
+            PR = cm_R + ec_mul(Ugamma, ipa(cs1, xs2)) + ec_mul(H, rho_R)
             PLR.insert(0, (PL, PR))
 
-            tr.append_message(b"PL", str(PL).encode())
-            tr.append_message(b"PR", str(PR).encode())
+            tr.append_point(b"PL", PL)
+            tr.append_point(b"PR", PR)
 
             # Round 3:   mu <~ Fr
-            mu = Fr.from_bytes(tr.challenge_bytes(b"mu", 1))
+            mu = tr.challenge_scalar(b"mu")
             if debug:
                 print(f"prove> mu: {mu}")
-            vec_c = [cs1[i] + mu * cs2[i] for i in range(half)]
-            vec_x = [xs1[i] + mu.inv() * xs2[i] for i in range(half)]
-            rho += rho_L * mu + rho_R * mu.inv()
+            mu_inv = mu.inv()
+            vec_c = vec_c.fold(mu)
+            vec_x = vec_x.fold(mu_inv)
+            rho += rho_L * mu + rho_R * mu_inv
 
-            G = [G1[i] + ec_mul(G2[i], mu.inv()) for i in range(half)]
+            G = self.pool.fold(G, half, mu_inv)
 
             # Debug
             if debug:
                 lhs = self.pcs.commit_with_pp(G, vec_c) + ec_mul(Ugamma, ipa(vec_c, vec_x)) + ec_mul(H, rho)
-                P += ec_mul(PL, mu) + ec_mul(PR, mu.inv())
+                P += ec_mul(PL, mu) + ec_mul(PR, mu_inv)
                 if lhs == P:
                     print(f"prove> [vec_c]_(G) + [<vec_c, vec_x>]_(H) == P + mu*PL + mu^(-1)*PR ok ")
                 else:
@@ -154,10 +175,10 @@ class IPA_PCS:
         G_new = G0 + ec_mul(Ugamma, x0)
         r, rho_r = Fr.rands(rng, 2)
         R = ec_mul(G_new, r) + ec_mul(H, rho_r)
-        tr.append_message(b"R", str(R).encode())
+        tr.append_point(b"R", R)
 
         # Round 5:  zeta <~ Fr
-        zeta = Fr.from_bytes(tr.challenge_bytes(b"zeta", 1))
+        zeta = tr.challenge_scalar(b"zeta")
         if debug:
             print(f"prove> zeta: {zeta}")
 
@@ -174,7 +195,7 @@ class IPA_PCS:
             else:
                 print(f"prove> Z == pcs.commit_with_pp(G, vec_z) failed ")
 
-            return (n, PLR, R, z, z_r)
+        return (n, PLR, R, z, z_r)
         
     def eval_verify(self, f_cm: G1Point, x: Fr, y: Fr, arg: IPA_PCS_Argument, tr: MerlinTranscript, debug=False) -> bool:
         """
@@ -194,18 +215,17 @@ class IPA_PCS:
         n, PLR, R, z, z_r = arg
         vec_x = [x**i for i in range(n)]
 
-        tr.append_message(b"f_cm", str(f_cm).encode())
-        tr.append_message(b"x", str(x).encode())
-        tr.append_message(b"y", str(y).encode())
+        tr.append_point(b"f_cm", f_cm)
+        tr.append_scalar(b"x", x)
+        tr.append_scalar(b"y", y)
 
-        G = self.pcs.pp[:n]
-        H = self.pcs.pp[-2]
-        U = self.pcs.pp[-1]
+        G = self.pcs.pp[0][:n]
+        U = self.pcs.pp[0][-1]
+        H = self.pcs.pp[1]
 
         # Round 1:   gamma <~ Fr 
 
-        # WARN: challenge should be 32 bytes long, here we use 1 byte for debugging
-        gamma = Fr.from_bytes(tr.challenge_bytes(b"gamma", 1))
+        gamma = tr.challenge_scalar(b"gamma")
         if debug:
             print(f"verify> gamma: {gamma}")
 
@@ -213,43 +233,41 @@ class IPA_PCS:
         P = f_cm + ec_mul(Ugamma, y)
 
         # Round 2:   PL, PR, ->
-        round = 0
-        half = n // 2
-        while half > 0:
-            PL, PR = PLR.pop()
-
-            tr.append_message(b"PL", str(PL).encode())
-            tr.append_message(b"PR", str(PR).encode())
+        mus = []
+        for PL, PR in reversed(PLR):
+            tr.append_point(b"PL", PL)
+            tr.append_point(b"PR", PR)
 
             # Round 3:   mu <~ Fr
-            mu = Fr.from_bytes(tr.challenge_bytes(b"mu", 1))
+            mu = tr.challenge_scalar(b"mu")
             if debug:
                 print(f"verify> mu: {mu}")
+            mus.append(mu)
 
-            G1 = G[:half]
-            G2 = G[half:]
+        # The challenges of all rounds are inverted together
+        mu_invs = Fr.batch_inv(mus)
+
+        half = n // 2
+        for (PL, PR), mu, mu_inv in zip(reversed(PLR), mus, mu_invs):
             xs1 = vec_x[:half]
             xs2 = vec_x[half:]
-            G = [G1[i] + ec_mul(G2[i], mu.inv()) for i in range(half)]
-            vec_x = [xs1[i] + mu.inv() * xs2[i] for i in range(half)]
-            
-            # print(f"verify> G[{round}]: {G}")
+            G = self.pool.fold(G, half, mu_inv)
+            vec_x = [xs1[i] + mu_inv * xs2[i] for i in range(half)]
 
             # Z_1 ?= Z + x * AL + x^{-1} * AR
         
-            P += ec_mul(PL, mu) + ec_mul(PR, mu.inv())
+            P += ec_mul(PL, mu) + ec_mul(PR, mu_inv)
             half = half // 2
-            round += 1
         
         assert len(G) == len(vec_x) == 1, "EROR: len(vec_c) and len(vec_x) should be 1"
         G0 = G[0]
         x0 = vec_x[0]
 
         # Round 4:  R -> 
-        tr.append_message(b"R", str(R).encode())
+        tr.append_point(b"R", R)
 
         # Round 5:  zeta <~ Fr
-        zeta = Fr.from_bytes(tr.challenge_bytes(b"zeta", 1))
+        zeta = tr.challenge_scalar(b"zeta")
         if debug:
             print(f"verify> zeta: {zeta}")
 
@@ -261,10 +279,8 @@ class IPA_PCS:
 
         return lhs == rhs
 
-def ipa(vec_a: list[Fr], vec_b: list[Fr]) -> Fr:
-    n = len(vec_a)
-    assert len(vec_b) == n
-    return sum(a * b for a, b in zip(vec_a, vec_b))
+def ipa(vec_a: list[Fr] | FrVector, vec_b: list[Fr] | FrVector) -> Fr:
+    return inner_product(vec_a, vec_b)
 
 def test_ipa_pcs():
 
@@ -281,9 +297,7 @@ def test_ipa_pcs():
 
     # commit to the polynomial
     rho_c = Fr.rand()
-    G = pcs.pp[:len(vec_c)]
-    H = pcs.pp[-2]
-    f_cm = pcs.commit_with_pp(G, vec_c) + ec_mul(H, rho_c)
+    f_cm = pcs.commit_with_blinder(vec_c, rho_c)
 
     # fork the transcript for both prover and verifier
     tr_prover = tr.fork(b"prover")
@@ -296,6 +310,31 @@ def test_ipa_pcs():
     # verifier verifies the argument
     verified = ipa_pcs.eval_verify(f_cm, x, y, arg, tr_verifier, debug=True)
     print(f"verified: {verified}")
+    assert verified, "the evaluation argument must verify"
+    assert not ipa_pcs.eval_verify(f_cm, x, y + Fr(1), arg, tr.fork(b"verifier"))
+
+def test_ipa_pcs_workers():
+
+    pcs = PedersenCommitment.setup(20)
+    tr = MerlinTranscript(b"ipa-pcs-workers")
+    vec_c = [Fr(i + 2) for i in range(8)]
+    x = Fr(4)
+    y = ipa(vec_c, [x**i for i in range(len(vec_c))])
+    rho_c = Fr.rand()
+    f_cm = pcs.commit_with_blinder(vec_c, rho_c)
+
+    ipa_pcs = IPA_PCS(pcs)
+    arg = ipa_pcs.eval_prove(f_cm, x, y, vec_c, rho_c, tr.fork(b"prover"))
+    with IPA_PCS(pcs, workers=2) as ipa_pcs_par:
+        ipa_pcs_par.pool.min_chunk = 1
+        arg_par = ipa_pcs_par.eval_prove(f_cm, x, y, vec_c, rho_c, tr.fork(b"prover"))
+        assert str(arg) == str(arg_par), "the parallel prover must produce the same argument"
+        assert ipa_pcs_par.eval_verify(f_cm, x, y, arg_par, tr.fork(b"verifier"))
+        # an empty instance is split into no chunks
+        assert ipa_pcs_par.pool.msms([([], []), (pcs.pp[0][:8], vec_c)]) == \
+            [G1Point.zero(), pcs.commit_with_pp(pcs.pp[0], vec_c)]
+    print("✅ IPA_PCS with workers Test Passed")
 
 if __name__ == "__main__":
-    test_ipa_pcs()
\ No newline at end of file
+    test_ipa_pcs()
+    test_ipa_pcs_workers()
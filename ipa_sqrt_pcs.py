@@ -9,6 +9,8 @@ from merlin.merlin_transcript import MerlinTranscript
 
 from pedersen import PedersenCommitment
 from mle import MLEPolynomial
+from pypcs.parallel import WorkerPool
+from pypcs.vector import FrVector, inner_product
 
 # WARNING: 
 #   1. For demonstration, we deliberately use an insecure random number 
@@ -17,9 +19,13 @@ from mle import MLEPolynomial
 #        
 #      See more here: https://docs.python.org/3/library/secrets.html
 #
-#   2. Challenges are only 1 byte long for simplicity, which is not secure.
+#   2. With a TRANSCRIPT_V1 transcript, challenges are only 1 byte long, 
+#      which is not secure.
 
 import random
+import mmap
+from collections import deque
+from typing import Iterable, Iterator
 
 # Implementation of Hyrax-PCS with sqrt(n) commitments from Section 6.1 in [WTSTW17]:
 #
@@ -42,15 +48,39 @@ class IPA_PCS:
     pcs: PedersenCommitment
     rng: random.Random
     debug: bool
+    pool: WorkerPool
 
-    def __init__(self, pcs: PedersenCommitment):
+    def __init__(self, pcs: PedersenCommitment, workers: int | None = None):
         """
         Args:
             pcs: the PedersenCommitment instance to use for the proof
+            workers: the number of processes for the MSMs, None to run in 
+                the current process
         """
         self.pcs = pcs
         self.rng = random.Random("ipa-pcs")
         self.debug = False
+        self.pool = WorkerPool(workers)
+
+    def close(self):
+        """
+        Shut down the worker processes of the pool, if any were started.
+        """
+        self.pool.close()
+
+    def __enter__(self) -> "IPA_PCS":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def commit_with_blinder(self, vs: list[Fr], r: Fr) -> G1Point:
+        """
+        Pedersen commitment to vs, spread over the worker pool if vs is large enough.
+        """
+        if self.pool.is_parallel(len(vs)):
+            return self.pool.msm(self.pcs.pp[0][:len(vs)] + [self.pcs.pp[1]], vs + [r])
+        return self.pcs.commit_with_blinder(vs, r)
 
     def commit(self, vec_a: list[Fr]) -> tuple[list[G1Point], list[Fr]]:
         """
@@ -58,16 +88,44 @@ class IPA_PCS:
         """
         logn = log_2(len(vec_a))
         half = logn // 2
-        row, col = 2**half, 2**(logn - half)
+        # The columns are indexed by the first logn // 2 variables, as in 
+        #   MLEPolynomial.evaluate_with_eq_factors
+        row, col = 2**(logn - half), 2**half
         
         print(f"row: {row}, col: {col}")
 
-        blinders = Fr.rands(self.rng, col)
+        return self.commit_stream(vec_a[i*col:(i+1)*col] for i in range(row))
+
+    def commit_stream(self, rows: Iterable[list[Fr]]) -> tuple[list[G1Point], list[Fr]]:
+        """
+        Commit to a matrix given as a stream of rows, one commitment per row.
+
+        The rows are consumed one by one, so they may come from a generator 
+        or a memory-mapped file (see `read_rows`) and the whole matrix is never 
+        held in memory. With workers, the rows are committed in the pool, with 
+        at most 2 * workers rows in flight.
 
+        Args:
+            rows: the rows of the matrix
+        Returns:
+            the commitments to the rows and their blinders, in row order
+        """
+        H = self.pcs.pp[1]
         a_cm = []
-        for i in range(row):
-            a_row = vec_a[i*row:(i+1)*row]
-            a_cm += [self.pcs.commit_with_blinder(a_row, blinders[i])]
+        blinders = []
+        pending = deque()
+        for a_row in rows:
+            blinder = Fr.rand(self.rng)
+            blinders.append(blinder)
+            if self.pool.workers <= 1:
+                a_cm.append(self.pcs.commit_with_blinder(a_row, blinder))
+                continue
+            assert len(self.pcs.pp[0]) > len(a_row)
+            pending.append(self.pool.submit_msm(self.pcs.pp[0][:len(a_row)] + [H], list(a_row) + [blinder]))
+            if len(pending) >= 2 * self.pool.workers:
+                a_cm.append(G1Point.from_jacobian(pending.popleft().result()))
+        while len(pending) > 0:
+            a_cm.append(G1Point.from_jacobian(pending.popleft().result()))
         return a_cm, blinders
     
     def batch_inner_product_prove(self, cm_a: list[G1Point], vec_a: list[Fr], blinders: list[Fr], \
@@ -77,19 +135,14 @@ class IPA_PCS:
         row = len(vec_b1)
         assert col * row == n, \
             f"vec_b0 and vec_b1 must have {n} elements, but got {col} and {row}"
-        assert len(blinders) == col, f"blinders must have {col} elements, but got {len(blinders)}"
+        assert len(blinders) == row, f"blinders must have {row} elements, but got {len(blinders)}"
 
         # G = self.pcs.pp[:col]
         # H = self.pcs.pp[-2]
 
-        f_folded = [0] * col
-        f_folded_cm = G1Point.zero()
-        blinders_folded = Fr(0)
-        for i in range(row):
-            for j in range(col):
-                f_folded[j] += vec_b1[i] * vec_a[i * row + j]
-            blinders_folded += vec_b1[i] * blinders[i]
-            f_folded_cm += ec_mul(cm_a[i], vec_b1[i])
+        f_folded = vec_mat_mul(vec_b1, vec_a, col)
+        blinders_folded = ipa(vec_b1, blinders)
+        f_folded_cm = self.pool.msm(cm_a, vec_b1)
         
         if self.debug:
             if ipa(f_folded, vec_b0) == v:
@@ -111,9 +164,8 @@ class IPA_PCS:
         col = len(vec_b0)
         row = len(vec_b1)
 
-        f_folded_cm = G1Point.zero()
-        for i in range(row):
-            f_folded_cm += ec_mul(cm_a[i], vec_b1[i])
+        assert len(cm_a) == row, f"cm_a must have {row} elements, but got {len(cm_a)}"
+        f_folded_cm = self.pool.msm(cm_a, vec_b1)
         verified = self.inner_product_verify(f_folded_cm, vec_b0, v, arg, tr)
         return verified
 
@@ -142,15 +194,15 @@ class IPA_PCS:
             else:
                 raise ValueError(f"inner_product_prove> cm_a must be {self.pcs.commit(vec_a, blinder_a)}, but got {cm_a}")
         
-        tr.append_message(b"cm_a", str(cm_a).encode())
-        tr.append_message(b"vec_b", str(vec_b).encode())
-        tr.append_message(b"c", str(c).encode())
+        tr.append_point(b"cm_a", cm_a)
+        tr.append_scalars(b"vec_b", vec_b)
+        tr.append_scalar(b"c", c)
 
         # Round 1:
         ra = Fr.rands(self.rng, n)
         ra_rho = Fr.rand(self.rng)
 
-        Ra = self.pcs.commit_with_blinder(ra, ra_rho)
+        Ra = self.commit_with_blinder(ra, ra_rho)
 
         e0 = sum([ra[i] * vec_b[i] for i in range(n)])
         e0_rho = Fr.rand(self.rng)
@@ -159,10 +211,10 @@ class IPA_PCS:
         E1 = self.pcs.commit_with_blinder([Fr.zero()], e1_rho)
 
         # Round 2:
-        tr.append_message(b"Ra", str(Ra).encode())
-        tr.append_message(b"E0", str(E0).encode())
-        tr.append_message(b"E1", str(E1).encode())
-        mu = Fr.from_bytes(tr.challenge_bytes(b"mu", 1))
+        tr.append_point(b"Ra", Ra)
+        tr.append_point(b"E0", E0)
+        tr.append_point(b"E1", E1)
+        mu = tr.challenge_scalar(b"mu")
         if self.debug:
             print(f"inner_product_prove> mu: {mu}")
 
@@ -198,26 +250,26 @@ class IPA_PCS:
             debug: whether to print debug information
         """
 
-        tr.append_message(b"cm_a", str(cm_a).encode())
-        tr.append_message(b"vec_b", str(vec_b).encode())
-        tr.append_message(b"c", str(c).encode())
+        tr.append_point(b"cm_a", cm_a)
+        tr.append_scalars(b"vec_b", vec_b)
+        tr.append_scalar(b"c", c)
 
         Ra, E0, E1, za, za_rho, ze = arg
         n = len(za)
 
         # Round 1:
-        tr.append_message(b"Ra", str(Ra).encode())
-        tr.append_message(b"E0", str(E0).encode())
-        tr.append_message(b"E1", str(E1).encode())
+        tr.append_point(b"Ra", Ra)
+        tr.append_point(b"E0", E0)
+        tr.append_point(b"E1", E1)
 
         # Round 2:
-        mu = Fr.from_bytes(tr.challenge_bytes(b"mu", 1))
+        mu = tr.challenge_scalar(b"mu")
         if self.debug:
             print(f"inner_product_verify> mu: {mu}")
 
         # Round 3:
         ab = sum([za[i] * vec_b[i] for i in range(n)])
-        cond0 = Ra + ec_mul(cm_a, mu) == self.pcs.commit_with_blinder(za, za_rho)
+        cond0 = Ra + ec_mul(cm_a, mu) == self.commit_with_blinder(za, za_rho)
         C = self.pcs.commit_with_blinder([c], Fr.zero())
         cond1 = E0 + ec_mul(E1, mu) + ec_mul(C, mu) == self.pcs.commit_with_blinder([ab], ze)
         print(f"inner_product_verify> cond0: {cond0}")
@@ -245,10 +297,11 @@ class IPA_PCS:
         n = next_power_of_two(len(coeffs))
         logn = log_2(n)
         logn_half = logn // 2
-        assert len(blinders_f) == 2**logn_half, f"blinders_f must have {2**logn_half} elements, but got {len(blinders_f)}"
+        row = 2**(logn - logn_half)
+        assert len(blinders_f) == row, f"blinders_f must have {row} elements, but got {len(blinders_f)}"
 
         x_powers_l = [x**(i) for i in range(2**logn_half)]
-        x_powers_r = [(x**(2**logn_half))**(i) for i in range(2**logn_half)]
+        x_powers_r = [(x**(2**logn_half))**(i) for i in range(row)]
         
         if self.debug:
             x_powers = [x**(i) for i in range(n)]
@@ -272,10 +325,11 @@ class IPA_PCS:
             tr: the Merlin transcript to use for the proof
         """
         n, inner_arg = arg
-        logn_half = log_2(n) // 2
+        logn = log_2(next_power_of_two(n))
+        logn_half = logn // 2
 
         x_powers_l = [x**(i) for i in range(2**logn_half)]
-        x_powers_r = [(x**(2**logn_half))**(i) for i in range(2**logn_half)]
+        x_powers_r = [(x**(2**logn_half))**(i) for i in range(2**(logn - logn_half))]
 
         return self.batch_inner_product_verify(cm_f, x_powers_l, x_powers_r, y, inner_arg, tr)
 
@@ -302,8 +356,7 @@ class IPA_PCS:
         us_r = us[f.num_var//2:]
         vec_eq_l = MLEPolynomial.eqs_over_hypercube(us_l)
         vec_eq_r = MLEPolynomial.eqs_over_hypercube(us_r)
-        vec_eq = MLEPolynomial.eqs_over_hypercube(us)
-        assert v == ipa(f.evals, vec_eq)
+        assert v == MLEPolynomial.evaluate_with_eq_factors(f.evals, vec_eq_l, vec_eq_r)
         arg = self.batch_inner_product_prove(cm_f, f.evals, blinders_f, vec_eq_l, vec_eq_r, v, tr)
         return arg
         
@@ -329,10 +382,42 @@ class IPA_PCS:
         verified = self.batch_inner_product_verify(cm_f, vec_eq_l, vec_eq_r, v, arg, tr)
         return verified
     
-def ipa(vec_a: list[Fr], vec_b: list[Fr]) -> Fr:
-    n = len(vec_a)
-    assert len(vec_b) == n
-    return sum(a * b for a, b in zip(vec_a, vec_b))
+def vec_mat_mul(vec_b: list[Fr], mat: list[Fr], col: int) -> list[Fr]:
+    """
+    Compute the vector-matrix product vec_b · A, where A is a row-major 
+    matrix with `col` columns, given as a flat list.
+
+    The products are accumulated per column as raw integers, and reduced 
+    modulo r only once per column at the end.
+    """
+    assert len(mat) == len(vec_b) * col, f"mat must have {len(vec_b) * col} elements, but got {len(mat)}"
+    acc = [0] * col
+    for i, b in enumerate(vec_b):
+        b = int(b)
+        if b == 0:
+            continue
+        a_row = mat[i * col:(i + 1) * col]
+        acc = [x + b * a.n for x, a in zip(acc, a_row)]
+    return [Fr(x) for x in acc]
+
+def read_rows(path: str, col: int) -> Iterator[list[Fr]]:
+    """
+    Read the rows of a matrix from a memory-mapped file of row-major 
+    scalars, each one 32 bytes big-endian.
+
+    Args:
+        path: the path of the file
+        col: the number of scalars per row
+    """
+    row_bytes = 32 * col
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            assert len(mm) % row_bytes == 0, f"the file size {len(mm)} is not a multiple of {row_bytes}"
+            for offset in range(0, len(mm), row_bytes):
+                yield [Fr.from_bytes(mm[i:i + 32]) for i in range(offset, offset + row_bytes, 32)]
+
+def ipa(vec_a: list[Fr] | FrVector, vec_b: list[Fr] | FrVector) -> Fr:
+    return inner_product(vec_a, vec_b)
 
 def test_ipa_uni_pcs():
 
@@ -398,6 +483,31 @@ def test_ipa_mle_pcs():
     print(f"mle_polycom verified: {verified}")
     assert verified, "MLE polynomial evaluation verification failed"
 
+def test_ipa_pcs_odd():
+
+    # With an odd number of variables, the matrix has twice as many rows 
+    #   as columns
+    pcs = PedersenCommitment.setup(20)
+    ipa_pcs = IPA_PCS(pcs)
+    tr = MerlinTranscript(b"ipa-pcs-odd")
+    rng = random.Random("test-ipa-pcs-odd")
+
+    f = MLEPolynomial(Fr.rands(rng, 32), 5)
+    us = Fr.rands(rng, 5)
+    v = f.evaluate(us)
+    cm_f, blinders_f = ipa_pcs.commit(f.evals)
+    assert len(cm_f) == len(blinders_f) == 8
+    arg = ipa_pcs.mle_poly_eval_prove(cm_f, us, v, f, blinders_f, tr.fork(b"prover"))
+    assert ipa_pcs.mle_poly_eval_verify(cm_f, us, v, arg, tr.fork(b"verifier"))
+    assert not ipa_pcs.mle_poly_eval_verify(cm_f, us, v + Fr(1), arg, tr.fork(b"verifier"))
+
+    coeffs = f.evals
+    x = Fr.rand(rng)
+    y = ipa(coeffs, [x**i for i in range(len(coeffs))])
+    arg = ipa_pcs.univariate_poly_eval_prove(cm_f, x, y, coeffs, blinders_f, tr.fork(b"prover"))
+    assert ipa_pcs.univariate_poly_eval_verify(cm_f, x, y, arg, tr.fork(b"verifier"))
+    print("✅ IPA_PCS odd num_var Test Passed")
+
 def test_inner_product():
 
     # initialize the PedersenCommitment and the IPA_PCS
@@ -430,8 +540,33 @@ def test_inner_product():
     print(f"inner_product verified: {verified}")
     assert verified, "inner product verification failed"
 
+def test_commit_stream():
+    import os, tempfile
+
+    pcs = PedersenCommitment.setup(20)
+    rng = random.Random("test-commit-stream")
+    rows = [Fr.rands(rng, 4) for _ in range(4)]
+    cm, blinders = IPA_PCS(pcs).commit([a for a_row in rows for a in a_row])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "rows.bin")
+        with open(path, "wb") as f:
+            for a_row in rows:
+                f.write(b"".join(a.n.to_bytes(32, "big") for a in a_row))
+        cm_file, blinders_file = IPA_PCS(pcs).commit_stream(read_rows(path, 4))
+
+    with IPA_PCS(pcs, workers=2) as ipa_pcs_par:
+        cm_par, blinders_par = ipa_pcs_par.commit_stream(iter(rows))
+
+    assert cm == cm_file == cm_par
+    assert blinders == blinders_file == blinders_par
+    assert all(pcs.open(cm[i], rows[i], blinders[i]) for i in range(len(rows)))
+    print("✅ commit_stream Test Passed")
+
 if __name__ == "__main__":
+    test_commit_stream()
     test_inner_product()
     test_ipa_mle_pcs()
     test_ipa_uni_pcs()
+    test_ipa_pcs_odd()
 
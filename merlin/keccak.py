@@ -8,6 +8,8 @@
 # and related or neighboring rights to the source code in this file.
 # http://creativecommons.org/publicdomain/zero/1.0/
 
+import struct
+
 
 def ROL64(a, n):
     return ((a >> (64 - (n % 64))) + (a << (n % 64))) % (1 << 64)
@@ -54,16 +56,83 @@ def store64(a):
 
 
 def KeccakF1600(state):
-    lanes = [
-        [load64(state[8 * (x + 5 * y) : 8 * (x + 5 * y) + 8]) for y in range(5)]
-        for x in range(5)
-    ]
-    lanes = KeccakF1600onLanes(lanes)
-    state = bytearray(200)
-    for x in range(5):
-        for y in range(5):
-            state[8 * (x + 5 * y) : 8 * (x + 5 * y) + 8] = store64(lanes[x][y])
-    return state
+    lanes = list(_LANES.unpack(state))
+    KeccakF1600onFlatLanes(lanes)
+    return bytearray(_LANES.pack(*lanes))
+
+
+# The flat-lane permutation below keeps the 25 lanes in a list indexed by
+# x + 5 * y, which is also their order in the 200-byte state, so the state
+# converts to and from the lanes with a single struct call. The rotation
+# offsets, the ρ/π lane destinations and the round constants are computed
+# once here from the definitions used in KeccakF1600onLanes.
+
+_LANES = struct.Struct("<25Q")
+
+_MASK64 = (1 << 64) - 1
+
+
+def _keccak_tables():
+    rotations = [0] * 25
+    (x, y) = (1, 0)
+    for t in range(24):
+        rotations[x + 5 * y] = ((t + 1) * (t + 2) // 2) % 64
+        (x, y) = (y, (2 * x + 3 * y) % 5)
+    # ρ and π: lane (x, y) is rotated, and moved to (y, 2x + 3y)
+    destinations = [y + 5 * ((2 * x + 3 * y) % 5) for y in range(5) for x in range(5)]
+    round_constants = []
+    R = 1
+    for round in range(24):
+        rc = 0
+        for j in range(7):
+            R = ((R << 1) ^ ((R >> 7) * 0x71)) % 256
+            if R & 2:
+                rc ^= 1 << ((1 << j) - 1)
+        round_constants.append(rc)
+    return rotations, destinations, round_constants
+
+
+KECCAK_ROTATIONS, KECCAK_PI, KECCAK_ROUND_CONSTANTS = _keccak_tables()
+
+_RHO_PI = [(i, i % 5, KECCAK_PI[i], KECCAK_ROTATIONS[i]) for i in range(25)]
+
+
+def KeccakF1600onFlatLanes(A):
+    """
+    The permutation, in place over the 25 lanes A[x + 5 * y].
+    """
+    mask = _MASK64
+    rho_pi = _RHO_PI
+    B = [0] * 25
+    for rc in KECCAK_ROUND_CONSTANTS:
+        # θ
+        C0 = A[0] ^ A[5] ^ A[10] ^ A[15] ^ A[20]
+        C1 = A[1] ^ A[6] ^ A[11] ^ A[16] ^ A[21]
+        C2 = A[2] ^ A[7] ^ A[12] ^ A[17] ^ A[22]
+        C3 = A[3] ^ A[8] ^ A[13] ^ A[18] ^ A[23]
+        C4 = A[4] ^ A[9] ^ A[14] ^ A[19] ^ A[24]
+        D = (
+            C4 ^ (((C1 << 1) | (C1 >> 63)) & mask),
+            C0 ^ (((C2 << 1) | (C2 >> 63)) & mask),
+            C1 ^ (((C3 << 1) | (C3 >> 63)) & mask),
+            C2 ^ (((C4 << 1) | (C4 >> 63)) & mask),
+            C3 ^ (((C0 << 1) | (C0 >> 63)) & mask),
+        )
+        # ρ and π
+        for i, x, j, r in rho_pi:
+            a = A[i] ^ D[x]
+            B[j] = ((a << r) | (a >> (64 - r))) & mask
+        # χ
+        for y in range(0, 25, 5):
+            B0, B1, B2, B3, B4 = B[y : y + 5]
+            A[y] = B0 ^ (~B1 & B2)
+            A[y + 1] = B1 ^ (~B2 & B3)
+            A[y + 2] = B2 ^ (~B3 & B4)
+            A[y + 3] = B3 ^ (~B4 & B0)
+            A[y + 4] = B4 ^ (~B0 & B1)
+        # ι
+        A[0] ^= rc
+    return A
 
 
 def Keccak(rate, capacity, inputBytes, delimitedSuffix, outputByteLen):
@@ -121,3 +190,25 @@ def SHA3_384(inputBytes):
 
 def SHA3_512(inputBytes):
     return Keccak(576, 1024, inputBytes, 0x06, 512 // 8)
+
+
+def test_keccak():
+    import hashlib
+    from random import Random
+
+    rng = Random("test-keccak")
+    # Around the rates of SHA3-256 (136 bytes) and SHAKE128 (168 bytes)
+    for n in [0, 1, 135, 136, 137, 167, 168, 169, 300]:
+        data = bytes(rng.getrandbits(8) for _ in range(n))
+        assert bytes(SHA3_256(data)) == hashlib.sha3_256(data).digest()
+        assert bytes(SHAKE128(data, 200)) == hashlib.shake_128(data).digest(200)
+
+    lanes = [rng.getrandbits(64) for _ in range(25)]
+    nested = [[lanes[x + 5 * y] for y in range(5)] for x in range(5)]
+    nested = KeccakF1600onLanes(nested)
+    assert KeccakF1600onFlatLanes(lanes) == [nested[x][y] for y in range(5) for x in range(5)]
+    print("✅ KeccakF1600 Test Passed")
+
+
+if __name__ == "__main__":
+    test_keccak()
@@ -1,12 +1,27 @@
 # Adapt transcript of [project](https://github.com/NOOMA-42/pylookup)
 
 from merlin.strobe import Strobe128
+from pypcs.curve import Fr
 
 MERLIN_PROTOCOL_LABEL = b"Merlin v1.0"
 
+# Encodings of the scalars and points appended by append_scalar(s) and
+# append_point(s):
+#   V1: the decimal strings of str(x), as the protocols first did
+#   V2: 32-byte big-endian scalars and 32-byte compressed points
+# and of the challenges drawn by challenge_scalar(s):
+#   V1: 1-byte challenges, as the protocols first did (NOT secure)
+#   V2: 64 bytes reduced modulo r, whose bias is below 2^-250
+TRANSCRIPT_V1 = 1
+TRANSCRIPT_V2 = 2
+
+CHALLENGE_BYTES = 64
+
 
 class MerlinTranscript:
-    def __init__(self, label: bytes) -> None:
+    def __init__(self, label: bytes, version: int = TRANSCRIPT_V2) -> None:
+        assert version in (TRANSCRIPT_V1, TRANSCRIPT_V2), f"unknown transcript version {version}"
+        self.version = version
         self.strobe: Strobe128 = Strobe128.new(MERLIN_PROTOCOL_LABEL)
         self.append_message(b"dom-sep", label)
 
@@ -19,13 +34,111 @@ class MerlinTranscript:
     def append_u64(self, label: bytes, x: int) -> None:
         self.append_message(label, x.to_bytes(8, "little"))
 
+    def append_scalar(self, label: bytes, x) -> None:
+        """
+        Append a scalar (an Fr, or an int in [0, 2^256)).
+        """
+        if self.version == TRANSCRIPT_V1:
+            self.append_message(label, str(x).encode())
+        else:
+            self.append_message(label, int(x).to_bytes(32, "big"))
+
+    def append_scalars(self, label: bytes, xs) -> None:
+        """
+        Append a vector of scalars as one message.
+        """
+        if self.version == TRANSCRIPT_V1:
+            self.append_message(label, str(xs).encode())
+        else:
+            self.append_message(label, b"".join(int(x).to_bytes(32, "big") for x in xs))
+
+    def append_point(self, label: bytes, pt) -> None:
+        """
+        Append a curve point, which must have a compressed to_bytes().
+        """
+        if self.version == TRANSCRIPT_V1:
+            self.append_message(label, str(pt).encode())
+        else:
+            self.append_message(label, pt.to_bytes())
+
     def challenge_bytes(self, label: bytes, length: int) -> bytes:
         data_len = length.to_bytes(4, "little")
         self.strobe.meta_ad(label, False)
         self.strobe.meta_ad(data_len, True)
         return self.strobe.prf(length, False)
 
+    def challenge_scalar(self, label: bytes) -> Fr:
+        """
+        Draw a challenge in Fr.
+        """
+        if self.version == TRANSCRIPT_V1:
+            return Fr.from_bytes(self.challenge_bytes(label, 1))
+        return Fr(int.from_bytes(self.challenge_bytes(label, CHALLENGE_BYTES), "big"))
+
+    def challenge_scalars(self, label: bytes, k: int) -> list[Fr]:
+        """
+        Draw k challenges in Fr, squeezed together in one prf call.
+        """
+        if self.version == TRANSCRIPT_V1:
+            return [self.challenge_scalar(label) for _ in range(k)]
+        bs = self.challenge_bytes(label, k * CHALLENGE_BYTES)
+        return [Fr(int.from_bytes(bs[i:i + CHALLENGE_BYTES], "big"))
+                for i in range(0, len(bs), CHALLENGE_BYTES)]
+
+    def snapshot(self) -> Strobe128:
+        """
+        Save the state of the transcript, to be rewound to with restore().
+        """
+        return self.strobe.copy()
+
+    def restore(self, snapshot: Strobe128) -> None:
+        """
+        Rewind the transcript to a state saved by snapshot(). The same
+        snapshot can be restored several times.
+        """
+        self.strobe = snapshot.copy()
+
     def fork(self, label: bytes) -> 'MerlinTranscript':
-        new_transcript = MerlinTranscript(label)
-        new_transcript.strobe = Strobe128(self.strobe.state.copy(), self.strobe.pos, self.strobe.pos_begin, self.strobe.cur_flags)
+        """
+        Copy the transcript, without initializing a new Strobe128.
+
+        NOTE: The copy continues from the state of this transcript, so the
+            label is not absorbed (the forks of a transcript are identical).
+        """
+        new_transcript = type(self).__new__(type(self))
+        new_transcript.version = self.version
+        new_transcript.strobe = self.strobe.copy()
         return new_transcript
+
+
+def test_transcript_snapshot():
+    tr = MerlinTranscript(b"test-snapshot")
+    tr.append_message(b"m", b"message")
+    snapshot = tr.snapshot()
+    c = tr.challenge_bytes(b"c", 32)
+    tr.restore(snapshot)
+    assert tr.challenge_bytes(b"c", 32) == c
+    tr.restore(snapshot)
+    assert tr.challenge_bytes(b"c", 32) == c
+    assert tr.challenge_bytes(b"c", 32) != c
+    print("✅ MerlinTranscript snapshot Test Passed")
+
+
+def test_transcript_fork():
+    class LabeledTranscript(MerlinTranscript):
+        pass
+
+    for version in [TRANSCRIPT_V1, TRANSCRIPT_V2]:
+        tr = LabeledTranscript(b"test-fork", version)
+        tr.append_scalars(b"xs", [Fr(1), Fr(2)])
+        fork = tr.fork(b"fork")
+        assert type(fork) is LabeledTranscript and fork.version == version
+        assert fork.challenge_scalars(b"c", 3) == tr.challenge_scalars(b"c", 3)
+        fork.append_u64(b"n", 1)
+        assert fork.challenge_bytes(b"c", 32) != tr.challenge_bytes(b"c", 32)
+    print("✅ MerlinTranscript fork Test Passed")
+
+
+if __name__ == "__main__":
+    test_transcript_snapshot()
+    test_transcript_fork()
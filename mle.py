@@ -1,9 +1,172 @@
 #!/usr/bin/env python3
 
+from collections import OrderedDict
 from functools import reduce
+from typing import Optional
 from utils import log_2, pow_2, bits_le_with_width
+from pypcs.curve import Fr
+from pypcs.vector import FrVector, inner_product
+from pypcs.parallel import WorkerPool, chunk_ranges
+
+def ntt_layers(vs, twiddle, start, end, p=None):
+    """
+    Run the layers start..end-1 of the MLE butterfly transform in place:
+
+        vs[l + half] += twiddle * vs[l],   half = 2^i, for every l with bit i unset
+
+    A layer is done with slice operations, either per block of 2 * half
+    contiguous entries, or (when the blocks are small) per offset inside 
+    the blocks with a stride of 2 * half. Both take at most sqrt(n) slices.
+
+    Args:
+        vs: the list to transform
+        twiddle: 1 or -1 (or any scalar)
+        start, end: the range of layers
+        p: the modulus, if vs holds raw residues
+    """
+    n = len(vs)
+    for i in range(start, end):
+        half = 1 << i
+        step = 2 * half
+        if half * half < n:
+            for o in range(half):
+                vs[o + half::step] = butterfly(vs[o::step], vs[o + half::step], twiddle, p)
+        else:
+            for j in range(0, n, step):
+                vs[j + half:j + step] = butterfly(vs[j:j + half], vs[j + half:j + step], twiddle, p)
+    return vs
+
+def butterfly(lo, hi, twiddle, p=None):
+    if p is None:
+        if twiddle == 1:
+            return [b + a for a, b in zip(lo, hi)]
+        if twiddle == -1:
+            return [b - a for a, b in zip(lo, hi)]
+        return [b + twiddle * a for a, b in zip(lo, hi)]
+    if twiddle == 1:
+        return [(b + a) % p for a, b in zip(lo, hi)]
+    if twiddle == -1:
+        return [(b - a) % p for a, b in zip(lo, hi)]
+    return [(b + twiddle * a) % p for a, b in zip(lo, hi)]
+
+def is_over_fr(vs) -> bool:
+    return isinstance(vs, FrVector) or all(type(v) is Fr for v in vs)
+
+def div_layer(lo: list[int], hi: list[int], u: int) -> tuple[list[int], list[int]]:
+    """
+    One layer of MLE division over residues: the quotient hi - lo, and the
+    remainder lo * (1 - u) + hi * u = lo + u * (hi - lo).
+    """
+    p = Fr.field_modulus
+    q = [(b - a) % p for a, b in zip(lo, hi)]
+    return q, [(a + u * d) % p for a, d in zip(lo, q)]
+
+def div_coeffs_layer(lo: list[int], hi: list[int], u: int) -> tuple[list[int], list[int]]:
+    """
+    One layer of MLE division over the residues of the coefficients: the 
+    quotient is hi itself (not returned), and the remainder lo + u * hi.
+    """
+    p = Fr.field_modulus
+    return [], [(a + u * b) % p for a, b in zip(lo, hi)]
+
+def map_layer(layer, e: list[int], half: int, u: int, pool: Optional[WorkerPool]) \
+        -> tuple[list[int], list[int]]:
+    """
+    Apply a division layer to the two halves of e[:2 * half], in chunks 
+    over the pool if it is large enough.
+    """
+    if pool is None or not pool.is_parallel(half):
+        return layer(e[:half], e[half:2 * half], u)
+    executor = pool.get_executor()
+    futures = [executor.submit(layer, e[i:j], e[half + i:half + j], u)
+               for i, j in chunk_ranges(half, pool.workers, pool.min_chunk)]
+    q, r = [], []
+    for future in futures:
+        qi, ri = future.result()
+        q += qi
+        r += ri
+    return q, r
+
+class EqTableCache:
+    """
+    An LRU cache of eq-tables over Fr, keyed by the point (u_0, ..., u_{k-1}),
+    which keeps the tables it holds within a memory budget.
+
+    With prefix sharing, a miss on (u_0, ..., u_{k-1}) looks up the longest
+    cached prefix (u_0, ..., u_{j-1}): the table of the point is obtained by
+    extending a copy of the table of the prefix with the rounds j..k-1 of
+    eqs_over_hypercube (see extend_eqs), so only those rounds are computed.
+    """
+
+    # Approximate memory of one entry: an Fr, its 254-bit int and a list slot
+    ENTRY_BYTES = 112
+
+    budget: int
+    prefix_sharing: bool
+    tables: OrderedDict[tuple[int, ...], list[Fr]]
+    nbytes: int
+    hits: int
+    misses: int
+
+    def __init__(self, budget: int = 64 << 20, prefix_sharing: bool = False):
+        """
+        Args:
+            budget: the memory budget in bytes for the cached tables
+            prefix_sharing: whether to extend the tables of cached prefixes
+        """
+        self.budget = budget
+        self.prefix_sharing = prefix_sharing
+        self.tables = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, rs: list[Fr]) -> list[Fr]:
+        """
+        Get the eq-table of the point rs. 
+        
+        The returned list is a copy, so the caller may modify it.
+        """
+        key = tuple(u.n for u in rs)
+        table = self.tables.get(key)
+        if table is not None:
+            self.tables.move_to_end(key)
+            self.hits += 1
+            return table.copy()
+        self.misses += 1
+
+        evals = [1] * (1 << len(key))
+        start = 0
+        if self.prefix_sharing:
+            for j in range(len(key) - 1, 0, -1):
+                prefix = self.tables.get(key[:j])
+                if prefix is not None:
+                    self.tables.move_to_end(key[:j])
+                    evals[:len(prefix)] = prefix
+                    start = j
+                    break
+        MLEPolynomial.extend_eqs(evals, rs, start)
+        self.insert(key, evals)
+        return evals.copy()
+
+    def insert(self, key: tuple[int, ...], table: list[Fr]):
+        nbytes = len(table) * self.ENTRY_BYTES
+        if nbytes > self.budget:
+            return
+        while self.nbytes + nbytes > self.budget:
+            _, evicted = self.tables.popitem(last=False)
+            self.nbytes -= len(evicted) * self.ENTRY_BYTES
+        self.tables[key] = table
+        self.nbytes += nbytes
+
+    def clear(self):
+        self.tables.clear()
+        self.nbytes = 0
 
 class MLEPolynomial:
+    # The cache in front of eqs_over_hypercube, None to disable it
+    eq_cache: Optional[EqTableCache] = None
+
     def __init__(self, evals, num_var):
         self.evals = evals
         self.num_var = num_var
@@ -33,11 +196,21 @@ class MLEPolynomial:
 
     @classmethod
     def eqs_over_hypercube(cls, rs):
+        if cls.eq_cache is not None and all(type(u) is Fr for u in rs):
+            return cls.eq_cache.get(rs)
         k = len(rs)
         n = 1 << k
         evals = [1] * n
-        half = 1
-        for i in range(k):
+        return cls.extend_eqs(evals, rs, 0)
+
+    @staticmethod
+    def extend_eqs(evals, rs, start):
+        """
+        Run the rounds start..k-1 of eqs_over_hypercube in place, where the 
+        first 2^start entries of evals hold the table of rs[:start].
+        """
+        half = 1 << start
+        for i in range(start, len(rs)):
             for j in range(half):
                 evals[j+half] = evals[j] * rs[i]
                 evals[j] = evals[j] - evals[j+half]
@@ -61,45 +234,164 @@ class MLEPolynomial:
         return cls(cls.compute_evals_from_coeffs(coeffs), num_var)
     
     @classmethod
-    def ntt_core(cls, vs, twiddle):
+    def ntt_core(cls, vs, twiddle, inplace=False):
+        """
+        The butterfly transform between the coefficients and the evaluations
+        of an MLE, with twiddle = 1 (coeffs -> evals) or -1 (evals -> coeffs):
+
+            vs[l + half] += twiddle * vs[l],   for every l with bit log(half) unset
+
+        Every layer is done with whole-slice list operations (see 
+        ntt_layers), and a FrVector is transformed over its raw residues.
+
+        Args:
+            vs: the list (or FrVector) to transform, of length 2^k
+            twiddle: 1 or -1
+            inplace: whether to overwrite vs, otherwise it is left unchanged
+        Returns:
+            the transformed list (vs itself if inplace)
+        """
+        k = log_2(len(vs))
+        if isinstance(vs, FrVector):
+            out = vs if inplace else FrVector(vs)
+            ntt_layers(out.ns, twiddle, 0, k, Fr.field_modulus)
+            return out
+        if is_over_fr(vs):
+            ns = ntt_layers([v.n for v in vs], twiddle, 0, k, Fr.field_modulus)
+            return cls.residues_to_output(vs, ns, inplace)
+        out = vs if inplace else list(vs)
+        return ntt_layers(out, twiddle, 0, k)
+
+    @staticmethod
+    def residues_to_output(vs, ns, inplace):
+        """
+        Return the residues ns of a transform of vs, in the form of vs.
+        """
+        if isinstance(vs, FrVector):
+            if not inplace:
+                return FrVector.from_residues(ns)
+            vs.ns[:] = ns
+            return vs
+        if not inplace:
+            return [Fr(x) for x in ns]
+        vs[:] = [Fr(x) for x in ns]
+        return vs
+
+    @classmethod
+    def ntt_core_parallel(cls, vs, twiddle, pool: WorkerPool, inplace=False):
+        """
+        Same as ntt_core, with the work spread over a process pool.
+
+        With P chunks of size C = n / P (P a power of two), the low log(C)
+        layers only mix entries inside a chunk, so each worker transforms
+        one chunk. The top log(P) layers only mix the entries at the same
+        offset of all the chunks, so each worker then transforms a range of
+        C / P offsets, across all the chunks.
+        """
         n = len(vs)
+        num_chunks = 1 << log_2(pool.workers) if pool.workers > 1 else 1
+        while num_chunks > 1 and num_chunks * num_chunks > n:
+            num_chunks >>= 1
+        if num_chunks < 2 or not pool.is_parallel(n // num_chunks * 2):
+            return cls.ntt_core(vs, twiddle, inplace)
+
+        p = Fr.field_modulus
+        ns = FrVector.residues(vs)
         k = log_2(n)
-        half = 1
-        for i in range(k):
-            for j in range(0, n, 2*half):
-                for l in range(j, j+half):
-                    vs[l+half] = vs[l+half] + twiddle * vs[l]
-            half <<= 1
-        return vs
+        C = n // num_chunks
+        logC = log_2(C)
+        executor = pool.get_executor()
+
+        # The low layers, one chunk per worker
+        futures = [executor.submit(ntt_layers, ns[i:i + C], twiddle, 0, logC, p) for i in range(0, n, C)]
+        ns = [x for future in futures for x in future.result()]
+
+        # The top layers, over the same range of offsets of all the chunks
+        w = C // num_chunks
+        futures = [executor.submit(ntt_layers, [x for c in range(0, n, C) for x in ns[c + o:c + o + w]], 
+                                   twiddle, log_2(w), log_2(w) + k - logC, p)
+                   for o in range(0, C, w)]
+        for o, future in zip(range(0, C, w), futures):
+            sub = future.result()
+            for c in range(num_chunks):
+                ns[c * C + o:c * C + o + w] = sub[c * w:(c + 1) * w]
+
+        return cls.residues_to_output(vs, ns, inplace)
 
     @classmethod
-    def compute_evals_from_coeffs(cls, f_coeffs):
+    def compute_evals_from_coeffs(cls, f_coeffs, inplace=False):
         """
         Compute the evaluations of the polynomial from the coefficients.
             Time: O(n * log(n))
         """
-        return cls.ntt_core(f_coeffs, 1)
+        return cls.ntt_core(f_coeffs, 1, inplace)
 
     @classmethod
-    def compute_coeffs_from_evals(cls, f_evals):
+    def compute_coeffs_from_evals(cls, f_evals, inplace=False):
         """
         Compute the evaluations of the polynomial from the coefficients.
             Time: O(n * log(n))
         """
-        return cls.ntt_core(f_evals, -1)
+        return cls.ntt_core(f_evals, -1, inplace)
     
     @classmethod
     def evaluate_from_evals(cls, evals, zs):
-        f = evals
+        """
+        Evaluate the MLE at zs by folding the evaluations, one variable per
+        round (the lowest bit of the index first).
 
-        half = len(f) >> 1
-        for z in zs:
-            even = f[::2]
-            odd = f[1::2]
-            f = [even[i] + z * (odd[i] - even[i]) for i in range(half)]
+        The first round folds `evals` into a scratch buffer of size n/2, and
+        the following rounds fold the buffer in place, so `evals` is never 
+        modified and no other list is allocated.
+        """
+        if isinstance(evals, FrVector):
+            return cls.evaluate_from_residues(evals.ns, zs)
+        if len(zs) == 0 or len(evals) == 1:
+            return evals[0]
+
+        half = len(evals) >> 1
+        z = zs[0]
+        f = [evals[2*i] + z * (evals[2*i+1] - evals[2*i]) for i in range(half)]
+        for z in zs[1:]:
             half >>= 1
+            cls.fold_in_place(f, half, z)
         return f[0]
-    
+
+    @staticmethod
+    def fold_in_place(f, half, z):
+        """
+        Fold the first 2*half entries of f into its first half entries:
+
+            f[i] = f[2i] + z * (f[2i+1] - f[2i]),   for i in 0..half-1
+
+        Entry i is written after entries 2i and 2i+1 are read, so a forward 
+        pass is safe.
+        """
+        for i in range(half):
+            e = f[2*i]
+            f[i] = e + z * (f[2*i+1] - e)
+
+    @classmethod
+    def evaluate_from_residues(cls, ns, zs):
+        """
+        Same as evaluate_from_evals, with the evaluations given as raw 
+        residues over Fr, e.g. the residues of a FrVector.
+        """
+        if len(zs) == 0 or len(ns) == 1:
+            return Fr(ns[0])
+        r = Fr.field_modulus
+
+        half = len(ns) >> 1
+        z = int(zs[0])
+        f = [(ns[2*i] + z * (ns[2*i+1] - ns[2*i])) % r for i in range(half)]
+        for z in zs[1:]:
+            z = int(z)
+            half >>= 1
+            for i in range(half):
+                e = f[2*i]
+                f[i] = (e + z * (f[2*i+1] - e)) % r
+        return Fr(f[0])
+
     @classmethod
     def evaluate_from_evals_2(cls, evals, zs):
         k = len(zs)
@@ -119,16 +411,72 @@ class MLEPolynomial:
         Evaluate the MLE polynomial at the given points.
 
         Args:
-            zs (list): List of points to evaluate the polynomial at.
+            zs (list | FrVector): List of points to evaluate the polynomial at.
 
         Returns:
             int: The evaluated value of the polynomial at the given points.
         """
-        if not isinstance(zs, list):
-            raise TypeError("Input zs must be a list.")
+        if not isinstance(zs, (list, FrVector)):
+            raise TypeError("Input zs must be a list or a FrVector.")
         
         return self.evaluate_from_evals(self.evals, zs)
-    
+
+    def evaluate_many(self, points: list) -> list:
+        """
+        Evaluate the MLE polynomial at several points.
+
+        The evaluations are converted to raw residues once, and each point
+        is then folded over them with evaluate_from_residues. No eq-table 
+        is built, as none would be shared between the points.
+        """
+        assert all(len(zs) == self.num_var for zs in points), "every point must have num_var coordinates"
+        ns = FrVector(self.evals).ns
+        return [self.evaluate_from_residues(ns, zs) for zs in points]
+
+    @classmethod
+    def evaluate_batch(cls, polys: list, point: list) -> list:
+        """
+        Evaluate several MLE polynomials with the same number of variables 
+        at one point, as the product of the matrix of their evaluations 
+        (one row per polynomial) with the eq-table of the point, which is 
+        computed only once.
+        """
+        assert all(f.num_var == len(point) for f in polys), "every polynomial must have len(point) variables"
+        eqs = FrVector(cls.eqs_over_hypercube(point))
+        return [inner_product(f.evals, eqs) for f in polys]
+
+    @classmethod
+    def evaluate_with_eq_factors(cls, evals, eq_l: list, eq_r: list) -> Fr:
+        """
+        Compute <evals, eq(u_l) ⊗ eq(u_r)> as a row/column double sum, where 
+        evals is seen as a row-major matrix with len(eq_l) columns:
+
+            f(u_l, u_r) = sum_j eq_r[j] * (sum_i evals[j * len(eq_l) + i] * eq_l[i])
+
+        Only the two factors are needed, and the full eq-table of 
+        len(evals) entries is never built.
+        """
+        col = len(eq_l)
+        assert col * len(eq_r) == len(evals), \
+            f"evals must have {col * len(eq_r)} elements, but got {len(evals)}"
+        r = Fr.field_modulus
+        eq_l = FrVector(eq_l)
+        acc = 0
+        for j, e in enumerate(FrVector.residues(eq_r)):
+            acc += inner_product(evals[j * col:(j + 1) * col], eq_l).n * e
+        return Fr(acc % r)
+
+    def evaluate_split(self, zs: list) -> Fr:
+        """
+        Evaluate the MLE polynomial at zs, through the eq-tables of the two 
+        halves of zs (see evaluate_with_eq_factors).
+        """
+        assert len(zs) == self.num_var, "the point must have num_var coordinates"
+        k = self.num_var // 2
+        eq_l = self.eqs_over_hypercube(zs[:k])
+        eq_r = self.eqs_over_hypercube(zs[k:])
+        return self.evaluate_with_eq_factors(self.evals, eq_l, eq_r)
+
     @staticmethod
     def evaluate_from_coeffs(coeffs, zs):
         z = len(zs)
@@ -142,34 +490,63 @@ class MLEPolynomial:
             half >>= 1
         return f[0]
 
-    def decompose_by_div(self, point):
+    def decompose_by_div(self, point, pool: Optional[WorkerPool] = None):
         """
         Divide an MLE at the point: [X_0, X_1, ..., X_{n-1}] in O(N) (Linear!)
 
         Args:
             poly (MLEPolynomial): the MLE polynomial to be divided
             point (list): the point to divide the polynomial
+            pool: the process pool for the large layers, if any
 
         Returns:
         list: quotients, the list of MLEs
         """
+        quotients = [None] * self.num_var
+        it = self.decompose_by_div_iter(point, pool)
+        while True:
+            try:
+                i, q = next(it)
+            except StopIteration as stop:
+                return quotients, stop.value
+            quotients[i] = q
+
+    def decompose_by_div_iter(self, point, pool: Optional[WorkerPool] = None):
+        """
+        Same as decompose_by_div, as a generator that yields each quotient 
+        as soon as it is computed, from the largest one: 
+
+            (k-1, q_{k-1}), (k-2, q_{k-2}), ..., (0, q_0)
+
+        The remainder f(point) is the return value of the generator. 
+        
+        self.evals is not copied: the first layer folds it into a new list 
+        of n/2 entries, and the caller may drop each quotient (e.g. after 
+        committing to it) before the next one is computed. With a pool, the
+        layers with at least 2 * pool.min_chunk entries are split over the 
+        processes.
+        """
         assert self.num_var == len(point), "Number of variables must match the point"
-        e = self.evals.copy()
         k = self.num_var
-        quotients = []
-        half = pow_2(k - 1)
-        for i in range(k):
-            q = [0] * half
-            for j in range(half):
-                q[j] = e[j + half] - e[j]
-                e[j] = e[j] * (1 - point[k-i-1]) + e[j + half] * point[k-i-1]
-            quotients.insert(0, MLEPolynomial(q, k-i-1))
-            half >>= 1
+        if not is_over_fr(self.evals):
+            e = self.evals
+            for i in reversed(range(k)):
+                half = pow_2(i)
+                q = [e[j + half] - e[j] for j in range(half)]
+                e = [e[j] * (1 - point[i]) + e[j + half] * point[i] for j in range(half)]
+                yield i, MLEPolynomial(q, i)
+            return e[0]
+
+        p = Fr.field_modulus
+        e = FrVector.residues(self.evals)
+        for i in reversed(range(k)):
+            half = pow_2(i)
+            q, e = map_layer(div_layer, e, half, int(point[i]), pool)
+            yield i, MLEPolynomial([Fr(x) for x in q], i)
+        return Fr(e[0])
 
-        return quotients, e[0]
-    
     @staticmethod
-    def decompose_by_div_from_coeffs(coeffs: list, point: list) -> list:
+    def decompose_by_div_from_coeffs(coeffs: list, point: list, pool: Optional[WorkerPool] = None) -> list:
         """
         Decompose the MLE polynomial into quotients by division.
 
@@ -181,27 +558,47 @@ class MLEPolynomial:
         Args:
             coeffs (list[Field]): The coefficients of the MLE polynomial to be divided
             point (list[Field]): The point to divide the polynomial
+            pool: the process pool for the large layers, if any
 
         Returns:
             list[Field]: Quotients [q_0, q_1, ..., q_{n-1}] where q_i(X_0, X_1, ..., X_{i-1})
         """
-        
+        quotients = [None] * len(point)
+        it = MLEPolynomial.decompose_by_div_from_coeffs_iter(coeffs, point, pool)
+        while True:
+            try:
+                i, q = next(it)
+            except StopIteration as stop:
+                return quotients, stop.value
+            quotients[i] = q
+
+    @staticmethod
+    def decompose_by_div_from_coeffs_iter(coeffs: list, point: list, pool: Optional[WorkerPool] = None):
+        """
+        Same as decompose_by_div_from_coeffs, as a generator of the 
+        coefficients of the quotients, from the largest one (see 
+        decompose_by_div_iter). coeffs is not modified.
+        """
         k = len(point)
         n = len(coeffs)
         assert n == pow_2(k), "Number of variables must match the point"
-        
-        coeffs = coeffs.copy()
-        quotients = []
-        half = pow_2(k - 1)
-        for i in range(k):
-            quo_coeffs = [0] * half
-            for j in range(half):
-                quo_coeffs[j] = coeffs[j + half]
-                coeffs[j] = coeffs[j] + point[k-i-1] * coeffs[j + half]
-            quotients.insert(0, quo_coeffs)
-            half >>= 1
 
-        return quotients, coeffs[0]
+        if not is_over_fr(coeffs):
+            c = coeffs
+            for i in reversed(range(k)):
+                half = pow_2(i)
+                q = c[half:2 * half]
+                c = [c[j] + point[i] * c[j + half] for j in range(half)]
+                yield i, q
+            return c[0]
+
+        c = FrVector.residues(coeffs)
+        for i in reversed(range(k)):
+            half = pow_2(i)
+            q = [Fr(x) for x in c[half:2 * half]]
+            _, c = map_layer(div_coeffs_layer, c, half, int(point[i]), pool)
+            yield i, q
+        return Fr(c[0])
     
     def mul_quotients(quotient, remainder, p):
         """
@@ -225,3 +622,120 @@ class MLEPolynomial:
             result[i + half] = r - (p - 1) * q
         return MLEPolynomial(result, quotient.num_var + 1)
 
+
+def test_evaluate():
+    from random import Random
+    rng = Random("test-mle-evaluate")
+    k = 5
+    evals = Fr.rands(rng, 1 << k)
+    evals_copy = evals.copy()
+    zs = Fr.rands(rng, k)
+    f = MLEPolynomial(evals, k)
+    v = f.evaluate(zs)
+    eqs = MLEPolynomial.eqs_over_hypercube_slow(k, zs)
+    assert v == sum(e * eq for e, eq in zip(evals, eqs))
+    assert evals == evals_copy
+    assert MLEPolynomial(FrVector(evals), k).evaluate(zs) == v
+    g = MLEPolynomial(Fr.rands(rng, 1 << k), k)
+    assert MLEPolynomial.evaluate_batch([f, g], zs) == [v, g.evaluate(zs)]
+    assert MLEPolynomial([Fr(7)], 0).evaluate([]) == Fr(7)
+    assert f.evaluate_split(zs) == MLEPolynomial(FrVector(evals), k).evaluate_split(zs) == v
+    print("✅ MLEPolynomial.evaluate Test Passed")
+
+def test_evaluate_many():
+    from random import Random
+    rng = Random("test-mle-evaluate-many")
+    k = 4
+    f = MLEPolynomial(Fr.rands(rng, 1 << k), k)
+    points = [Fr.rands(rng, k) for _ in range(3)]
+    assert f.evaluate_many(points) == [f.evaluate(zs) for zs in points]
+    polys = [MLEPolynomial(Fr.rands(rng, 1 << k), k) for _ in range(3)]
+    assert MLEPolynomial.evaluate_batch(polys, points[0]) == [g.evaluate(points[0]) for g in polys]
+    print("✅ MLEPolynomial.evaluate_many Test Passed")
+
+def test_eq_table_cache():
+    from random import Random
+    rng = Random("test-eq-table-cache")
+    us = Fr.rands(rng, 5)
+    expected = [MLEPolynomial.eqs_over_hypercube(us[:k]) for k in range(6)]
+    try:
+        MLEPolynomial.eq_cache = EqTableCache(prefix_sharing=True)
+        assert MLEPolynomial.eqs_over_hypercube(us[:3]) == expected[3]
+        assert MLEPolynomial.eqs_over_hypercube(us) == expected[5]
+        table = MLEPolynomial.eqs_over_hypercube(us)
+        table[0] = Fr(0)
+        assert MLEPolynomial.eqs_over_hypercube(us) == expected[5]
+        assert MLEPolynomial.eq_cache.hits == 2 and MLEPolynomial.eq_cache.misses == 2
+
+        MLEPolynomial.eq_cache = EqTableCache(budget=20 * EqTableCache.ENTRY_BYTES)
+        for k in range(6):
+            assert MLEPolynomial.eqs_over_hypercube(us[:k]) == expected[k]
+        assert MLEPolynomial.eq_cache.nbytes <= MLEPolynomial.eq_cache.budget
+        assert tuple(u.n for u in us) not in MLEPolynomial.eq_cache.tables
+    finally:
+        MLEPolynomial.eq_cache = None
+    print("✅ EqTableCache Test Passed")
+
+def test_ntt_core():
+    from random import Random
+    rng = Random("test-mle-ntt")
+    k = 8
+    coeffs = Fr.rands(rng, 1 << k)
+    coeffs_copy = coeffs.copy()
+    evals = MLEPolynomial.compute_evals_from_coeffs(coeffs)
+    assert coeffs == coeffs_copy
+    zs = Fr.rands(rng, k)
+    assert MLEPolynomial.evaluate_from_evals(evals, zs) == MLEPolynomial.evaluate_from_coeffs(coeffs, zs)
+    assert MLEPolynomial.compute_coeffs_from_evals(evals) == coeffs
+    assert MLEPolynomial.ntt_core(FrVector(coeffs), 1) == evals
+
+    vs = coeffs.copy()
+    assert MLEPolynomial.ntt_core(vs, 1, inplace=True) is vs and vs == evals
+
+    pool = WorkerPool(workers=4, min_chunk=16)
+    try:
+        assert MLEPolynomial.ntt_core_parallel(coeffs, 1, pool) == evals
+        assert MLEPolynomial.ntt_core_parallel(FrVector(evals), -1, pool) == coeffs
+    finally:
+        pool.close()
+    print("✅ MLEPolynomial.ntt_core Test Passed")
+
+def test_decompose_by_div():
+    from random import Random
+    rng = Random("test-mle-div")
+    k = 5
+    evals = Fr.rands(rng, 1 << k)
+    f = MLEPolynomial(evals, k)
+    us = Fr.rands(rng, k)
+    xs = Fr.rands(rng, k)
+    quotients, remainder = f.decompose_by_div(us)
+    assert remainder == f.evaluate(us)
+    assert [q.num_var for q in quotients] == list(range(k))
+    rhs = remainder + sum((xs[i] - us[i]) * q.evaluate(xs[:i]) for i, q in enumerate(quotients))
+    assert f.evaluate(xs) == rhs
+
+    int_quotients, int_remainder = MLEPolynomial([int(v) for v in evals], k).decompose_by_div(us)
+    assert Fr(int_remainder) == remainder
+    assert [[Fr(x) for x in q.evals] for q in int_quotients] == [q.evals for q in quotients]
+
+    coeffs = MLEPolynomial.compute_coeffs_from_evals(evals)
+    quo_coeffs, remainder2 = MLEPolynomial.decompose_by_div_from_coeffs(coeffs, us)
+    assert remainder2 == remainder
+    assert [MLEPolynomial.compute_evals_from_coeffs(c) for c in quo_coeffs] == [q.evals for q in quotients]
+
+    pool = WorkerPool(workers=2, min_chunk=4)
+    try:
+        streamed = [(i, q.evals) for i, q in f.decompose_by_div_iter(us, pool)]
+        assert streamed == [(i, q.evals) for i, q in reversed(list(enumerate(quotients)))]
+        assert MLEPolynomial.decompose_by_div_from_coeffs(coeffs, us, pool) == (quo_coeffs, remainder)
+    finally:
+        pool.close()
+    assert f.evals == evals
+    print("✅ MLEPolynomial.decompose_by_div Test Passed")
+
+if __name__ == "__main__":
+    test_evaluate()
+    test_evaluate_many()
+    test_eq_table_cache()
+    test_ntt_core()
+    test_decompose_by_div()
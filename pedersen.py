@@ -4,7 +4,7 @@
 # It is only for educational purposes. DO NOT use it in production.
 
 
-from pypcs.curve import Fp, Fr, ec_mul, G1Point
+from pypcs.curve import Fp, Fr, ec_mul, ec_msm, ec_fixed_base_msm, G1Point, FixedBaseTable, SCALAR_BITS
 import random
 
 # WARNING: 
@@ -20,19 +20,68 @@ import random
 #      See more here: https://datatracker.ietf.org/doc/html/draft-irtf-cfrg-hash-to-curve-11
 
 class PedersenCommitment:
+    # The cost of ec_msm per point, in mixed additions, measured against 
+    #   the fixed-base tables (about 8us per addition): 714us per point at 
+    #   n=16, 532us at n=64, 406us at n=256 and 335us at n=2048
+    MSM_ADDS_PER_POINT = [(16, 90), (64, 66), (128, 54), (256, 50), (512, 45), (2048, 42)]
+
+    # The windows tried when table_window is derived from the budget
+    TABLE_WINDOWS = [8, 7, 6, 5, 4]
+
     pp: tuple[list[G1Point], G1Point]
+    table_budget: int
+    table_window: int
+    table_max_len: int | None
+    tables: dict[int, FixedBaseTable]
 
-    def __init__(self, pp: tuple[list[G1Point], G1Point]):
+    def __init__(self, pp: tuple[list[G1Point], G1Point], table_budget: int = 0, table_window: int | None = None):
+        """
+        Args:
+            pp: the generators (vec_G, H)
+            table_budget: the memory budget in bytes for the fixed-base tables 
+                of the generators, 0 to disable them
+            table_window: the window size of the fixed-base tables, None for 
+                the largest one with which all the generators fit in the 
+                budget (4 if none does)
+        """
         vec_G, H = pp
         if not isinstance(vec_G, list):
             raise ValueError("pp.G must be a list of G1Point")
         if not isinstance(H, G1Point):
             raise ValueError("pp.H must be a G1Point")
         self.pp = pp
+        self.table_budget = table_budget
+        if table_window is None:
+            table_window = next((w for w in self.TABLE_WINDOWS 
+                                 if (len(vec_G) + 1) * FixedBaseTable.nbytes(w) <= table_budget), 
+                                self.TABLE_WINDOWS[-1])
+        self.table_window = table_window
+        self.table_max_len = self.crossover(table_window)
+        # Tables are built lazily on first use, keyed by the index in vec_G,
+        #   and -1 for H
+        self.tables = {}
+
+    @classmethod
+    def crossover(cls, window: int) -> int | None:
+        """
+        The longest commitment for which the tables of the given window are 
+        cheaper than ec_msm, i.e. ceil(254/window) additions per scalar 
+        against MSM_ADDS_PER_POINT. None if the tables win at every measured 
+        length. With w=4 the tables stop paying off after 64 elements, while 
+        w=8 tables (32 additions) stay ahead up to n=2048 at least.
+        """
+        adds = -(-SCALAR_BITS // window)
+        if adds < cls.MSM_ADDS_PER_POINT[-1][1]:
+            return None
+        max_len = 0
+        for n, msm_adds in cls.MSM_ADDS_PER_POINT:
+            if msm_adds > adds:
+                max_len = n
+        return max_len
 
     # NOTE: Insecure setup, please DON'T use it in production.
     @classmethod
-    def setup(cls, n: int) -> "PedersenCommitment":
+    def setup(cls, n: int, table_budget: int = 0, table_window: int | None = None) -> "PedersenCommitment":
         vec_G = []
         rnd_gen = random.Random("vector-pedersen-setup")
         for _ in range(n):
@@ -40,23 +89,53 @@ class PedersenCommitment:
             vec_G.append(ec_mul(G1Point.ec_gen_group1(), s))
         s = Fr.rand(rnd_gen)
         H = ec_mul(G1Point.ec_gen_group1(), s)
-        return cls((vec_G, H))
+        G1Point.batch_normalize(vec_G + [H])
+        return cls((vec_G, H), table_budget, table_window)
+
+    def table(self, i: int) -> FixedBaseTable | None:
+        """
+        Get the fixed-base table of vec_G[i] (or H if i = -1), building it 
+        if it still fits in the memory budget.
+        """
+        if i in self.tables:
+            return self.tables[i]
+        nbytes = FixedBaseTable.nbytes(self.table_window)
+        if (len(self.tables) + 1) * nbytes > self.table_budget:
+            return None
+        table = FixedBaseTable(self.pp[0][i] if i >= 0 else self.pp[1], self.table_window)
+        self.tables[i] = table
+        return table
+
+    def _commit(self, vs: list[Fr], r: Fr | None) -> G1Point:
+        indices = list(range(len(vs)))
+        coeffs = list(vs)
+        if r is not None:
+            indices.append(-1)
+            coeffs.append(r)
+        if self.table_budget == 0 or (self.table_max_len is not None and len(vs) > self.table_max_len):
+            return ec_msm([self.pp[0][i] if i >= 0 else self.pp[1] for i in indices], coeffs)
+
+        # Fixed-base tables where available, an MSM over the rest
+        tables, table_coeffs, pts, pt_coeffs = [], [], [], []
+        for i, coeff in zip(indices, coeffs):
+            table = self.table(i)
+            if table is not None:
+                tables.append(table)
+                table_coeffs.append(coeff)
+            else:
+                pts.append(self.pp[0][i] if i >= 0 else self.pp[1])
+                pt_coeffs.append(coeff)
+        return ec_fixed_base_msm(tables, table_coeffs) + ec_msm(pts, pt_coeffs)
 
     def commit(self, vs: list[Fr], rng: random.Random) -> G1Point:
         assert len(self.pp[0]) > len(vs)
         assert isinstance(rng, random.Random), f"rng must be a random.Random, but got {type(rng)}"
-        cm = G1Point.zero()
         r = Fr.rand(rng)
-        for i in range(len(vs)):
-            cm += ec_mul(self.pp[0][i], vs[i])
-        return cm + ec_mul(self.pp[1], r)
+        return self._commit(vs, r)
     
     def commit_with_blinder(self, vs: list[Fr], r: Fr) -> G1Point:
         assert len(self.pp[0]) > len(vs)
-        cm = G1Point.zero()
-        for i in range(len(vs)):
-            cm += ec_mul(self.pp[0][i], vs[i])
-        return cm + ec_mul(self.pp[1], r)
+        return self._commit(vs, r)
 
     def open(self, cm: G1Point, vs: list[Fr], r: Fr) -> bool:
         cm2 = self.commit_with_blinder(vs, r)
@@ -64,10 +143,7 @@ class PedersenCommitment:
 
     def commit_without_blinder(self, vs: list[Fr]) -> G1Point:
         assert len(self.pp[0]) > len(vs)
-        cm = G1Point.zero()
-        for i in range(len(vs)):
-            cm += ec_mul(self.pp[0][i], vs[i])
-        return cm
+        return self._commit(vs, None)
 
     def open_without_blinder(self, cm: G1Point, vs: list[Fr]) -> bool:
         cm2 = self.commit_without_blinder(vs)
@@ -76,10 +152,7 @@ class PedersenCommitment:
     @classmethod
     def commit_with_pp(cls, new_pp: list[G1Point], vs: list[Fr]) -> G1Point:
         assert len(new_pp) >= len(vs), f"len(new_pp): {len(new_pp)} < len(vs): {len(vs)}"
-        cm = G1Point.zero()
-        for i in range(len(vs)):
-            cm += ec_mul(new_pp[i], vs[i])
-        return cm
+        return ec_msm(new_pp[:len(vs)], vs)
 
     @classmethod
     def open_with_pp(cls, new_pp: list[G1Point], cm: G1Point, vs: list[Fr]) -> bool:
@@ -100,5 +173,41 @@ def test_pedersen():
     assert PedersenCommitment.open_with_pp(cms.pp[0][:11], cm2, vs)
     print("✅ Pedersen Commitment with new pp Test Passed")
 
+def test_pedersen_tables():
+    cms = PedersenCommitment.setup(20)
+    cms_tables = PedersenCommitment(cms.pp, table_budget=8 * FixedBaseTable.nbytes(4))
+    vs = [Fr.rand() for _ in range(10)]
+    r = Fr.rand()
+    cm = cms.commit_with_blinder(vs, r)
+    assert cms_tables.commit_with_blinder(vs, r) == cm
+    assert len(cms_tables.tables) == 8, "the tables must stay within the budget"
+    assert cms_tables.open(cm, vs, r)
+    assert cms_tables.commit_without_blinder(vs) == cms.commit_without_blinder(vs)
+    print("✅ Pedersen Commitment with fixed-base tables Test Passed")
+
+def test_pedersen_tables_crossover():
+    assert PedersenCommitment.crossover(4) == 64
+    assert PedersenCommitment.crossover(5) == 128
+    assert PedersenCommitment.crossover(8) is None
+
+    cms = PedersenCommitment.setup(66)
+    assert PedersenCommitment(cms.pp, table_budget=67 * FixedBaseTable.nbytes(8)).table_window == 8
+    assert PedersenCommitment(cms.pp, table_budget=67 * FixedBaseTable.nbytes(6)).table_window == 6
+    assert PedersenCommitment(cms.pp, table_budget=FixedBaseTable.nbytes(8)).table_window == 4
+
+    # With w=4 tables, vectors longer than the crossover go to ec_msm without 
+    #   building any table, and the blinder does not count in the length
+    cms_tables = PedersenCommitment(cms.pp, table_budget=67 * FixedBaseTable.nbytes(4), table_window=4)
+    rng = random.Random("test-pedersen-tables-crossover")
+    vs = Fr.rands(rng, 65)
+    assert cms_tables.commit_without_blinder(vs) == cms.commit_without_blinder(vs)
+    assert len(cms_tables.tables) == 0
+    vs, r = Fr.rands(rng, 64), Fr.rand(rng)
+    assert cms_tables.commit_with_blinder(vs, r) == cms.commit_with_blinder(vs, r)
+    assert len(cms_tables.tables) == 65
+    print("✅ Pedersen Commitment fixed-base tables crossover Test Passed")
+
 if __name__ == "__main__":
-    test_pedersen()
\ No newline at end of file
+    test_pedersen()
+    test_pedersen_tables()
+    test_pedersen_tables_crossover()
\ No newline at end of file
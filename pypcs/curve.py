@@ -15,9 +15,69 @@ G2Point = NewType("G2Point", tuple[bn128.FQ2, bn128.FQ2])
 
 BN128_CURVE_ORDER = bn128.curve_order
 
-class Fr(FQ):
+def batch_inverse(xs: list[int], p: int) -> list[int]:
+    """
+    Invert a list of integers modulo a prime p by Montgomery's trick, 
+    with one modular inversion and 3(n-1) multiplications.
+
+    As prime_field_inv, zeros are mapped to zero.
+    """
+    prods = []
+    acc = 1
+    for x in xs:
+        prods.append(acc)
+        if x % p != 0:
+            acc = acc * x % p
+    acc_inv = prime_field_inv(acc, p)
+    result = [0] * len(xs)
+    for i in reversed(range(len(xs))):
+        x = xs[i] % p
+        if x == 0:
+            continue
+        result[i] = acc_inv * prods[i] % p
+        acc_inv = acc_inv * x % p
+    return result
+
+_object_new = object.__new__
+
+class Fr:
+    """
+    An element of the scalar field of BN128.
+
+    It keeps the interface of py_ecc's FQ (`.n`, the operators, `one()` and 
+    `zero()`), but it is a standalone `__slots__` class: no per-instance 
+    `__dict__`, and the arithmetic between two Fr values works on the raw
+    integers directly, without the isinstance checks and re-reduction of 
+    FQ. Results are built without going through `__init__`.
+    """
+    __slots__ = ("n",)
+
+    n: int
     field_modulus = bn128.curve_order
 
+    def __init__(self, val: "int | Fr | FQ"):
+        if isinstance(val, int):
+            self.n = val % self.field_modulus
+        elif isinstance(val, (Fr, FQ)):
+            self.n = val.n % self.field_modulus
+        else:
+            raise TypeError(f"Expected an int or Fr object, but got object of type {type(val)}")
+
+    @classmethod
+    def _from_int(cls, n: int) -> "Fr":
+        # NOTE: n must already be reduced into [0, r)
+        x = _object_new(cls)
+        x.n = n
+        return x
+
+    @classmethod
+    def one(cls) -> "Fr":
+        return cls._from_int(1)
+
+    @classmethod
+    def zero(cls) -> "Fr":
+        return cls._from_int(0)
+
     @classmethod
     def rand(cls, rndg: Optional[Random] = None) -> "Fr":
         if rndg is None:
@@ -32,10 +92,101 @@ class Fr(FQ):
     def from_bytes(cls, b: bytes) -> "Fr":
         i = int.from_bytes(b, "big")
         return cls(i)
+
+    def to_bytes(self) -> bytes:
+        """
+        The canonical 32-byte big-endian encoding.
+        """
+        return self.n.to_bytes(32, "big")
     
     def inv(self) -> "Fr":
-        return Fr(prime_field_inv(self.n, self.field_modulus))
-    
+        return Fr._from_int(prime_field_inv(self.n, self.field_modulus))
+
+    @classmethod
+    def batch_inv(cls, xs: list["Fr"]) -> list["Fr"]:
+        """
+        Invert all the elements with a single field inversion.
+        """
+        return [cls._from_int(x) for x in batch_inverse([x.n for x in xs], cls.field_modulus)]
+
+    def __add__(self, other: "Fr | int") -> "Fr":
+        if type(other) is Fr:
+            x = _object_new(Fr)
+            x.n = (self.n + other.n) % BN128_CURVE_ORDER
+            return x
+        if isinstance(other, int):
+            return Fr._from_int((self.n + other) % BN128_CURVE_ORDER)
+        return NotImplemented
+
+    __radd__ = __add__
+
+    def __sub__(self, other: "Fr | int") -> "Fr":
+        if type(other) is Fr:
+            x = _object_new(Fr)
+            x.n = (self.n - other.n) % BN128_CURVE_ORDER
+            return x
+        if isinstance(other, int):
+            return Fr._from_int((self.n - other) % BN128_CURVE_ORDER)
+        return NotImplemented
+
+    def __rsub__(self, other: int) -> "Fr":
+        if isinstance(other, int):
+            return Fr._from_int((other - self.n) % BN128_CURVE_ORDER)
+        return NotImplemented
+
+    def __mul__(self, other: "Fr | int") -> "Fr":
+        if type(other) is Fr:
+            x = _object_new(Fr)
+            x.n = self.n * other.n % BN128_CURVE_ORDER
+            return x
+        if isinstance(other, int):
+            return Fr._from_int(self.n * other % BN128_CURVE_ORDER)
+        return NotImplemented
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other: "Fr | int") -> "Fr":
+        if type(other) is Fr:
+            on = other.n
+        elif isinstance(other, int):
+            on = other
+        else:
+            return NotImplemented
+        return Fr._from_int(self.n * prime_field_inv(on, BN128_CURVE_ORDER) % BN128_CURVE_ORDER)
+
+    def __rtruediv__(self, other: int) -> "Fr":
+        if isinstance(other, int):
+            return Fr._from_int(other * prime_field_inv(self.n, BN128_CURVE_ORDER) % BN128_CURVE_ORDER)
+        return NotImplemented
+
+    def __pow__(self, other: int) -> "Fr":
+        if other < 0:
+            return Fr._from_int(pow(prime_field_inv(self.n, BN128_CURVE_ORDER), -other, BN128_CURVE_ORDER))
+        return Fr._from_int(pow(self.n, other, BN128_CURVE_ORDER))
+
+    def __neg__(self) -> "Fr":
+        return Fr._from_int(-self.n % BN128_CURVE_ORDER)
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is Fr:
+            return self.n == other.n
+        if isinstance(other, int):
+            return self.n == other
+        return NotImplemented
+
+    def __ne__(self, other: object) -> bool:
+        eq = self.__eq__(other)
+        return eq if eq is NotImplemented else not eq
+
+    def __lt__(self, other: "Fr | int") -> bool:
+        return self.n < int(other)
+
+    def __int__(self) -> int:
+        return self.n
+
+    def __repr__(self) -> str:
+        return repr(self.n)
+
     def __str__(self) -> str:
         k = self.field_modulus // 2
         if self.n < k:
@@ -45,38 +196,274 @@ class Fr(FQ):
 
 Fp = NewType("BaseField", bn128.FQ)
 
+BN128_FIELD_MODULUS = bn128.field_modulus
+
+# A point in Jacobian coordinates (X, Y, Z) over Fp, which represents the 
+# affine point (X/Z^2, Y/Z^3). The point at infinity has Z = 0.
+#
+# Group operations in Jacobian coordinates need no field inversion, so 
+# results are only normalized (Z = 1) when the affine form is needed.
+JacobianPoint = tuple[int, int, int]
+
+JAC_ZERO: JacobianPoint = (1, 1, 0)
+
+def jac_double(pt: JacobianPoint) -> JacobianPoint:
+    """
+    Double a point on y^2 = x^3 + 3 (dbl-2009-l).
+    """
+    X, Y, Z = pt
+    if Z == 0 or Y == 0:
+        return JAC_ZERO
+    p = BN128_FIELD_MODULUS
+    A = X * X % p
+    B = Y * Y % p
+    C = B * B % p
+    D = 2 * ((X + B) * (X + B) - A - C) % p
+    E = 3 * A % p
+    X3 = (E * E - 2 * D) % p
+    Y3 = (E * (D - X3) - 8 * C) % p
+    Z3 = 2 * Y * Z % p
+    return (X3, Y3, Z3)
+
+def jac_add(p1: JacobianPoint, p2: JacobianPoint) -> JacobianPoint:
+    """
+    Add two points (add-1998-cmo-2), with a shortcut for a normalized p2.
+    """
+    X1, Y1, Z1 = p1
+    X2, Y2, Z2 = p2
+    if Z1 == 0:
+        return p2
+    if Z2 == 0:
+        return p1
+    p = BN128_FIELD_MODULUS
+    Z1Z1 = Z1 * Z1 % p
+    U2 = X2 * Z1Z1 % p
+    S2 = Y2 * Z1 * Z1Z1 % p
+    if Z2 == 1:
+        U1, S1 = X1, Y1
+    else:
+        Z2Z2 = Z2 * Z2 % p
+        U1 = X1 * Z2Z2 % p
+        S1 = Y1 * Z2 * Z2Z2 % p
+    H = (U2 - U1) % p
+    R = (S2 - S1) % p
+    if H == 0:
+        if R == 0:
+            return jac_double(p1)
+        return JAC_ZERO
+    HH = H * H % p
+    HHH = H * HH % p
+    V = U1 * HH % p
+    X3 = (R * R - HHH - 2 * V) % p
+    Y3 = (R * (V - X3) - S1 * HHH) % p
+    Z3 = Z1 * H % p if Z2 == 1 else Z1 * Z2 * H % p
+    return (X3, Y3, Z3)
+
+def jac_neg(pt: JacobianPoint) -> JacobianPoint:
+    X, Y, Z = pt
+    return (X, (-Y) % BN128_FIELD_MODULUS, Z)
+
+def jac_mul(pt: JacobianPoint, k: int) -> JacobianPoint:
+    """
+    Scalar multiplication by left-to-right double-and-add.
+    """
+    acc = JAC_ZERO
+    for bit in bin(k)[2:]:
+        acc = jac_double(acc)
+        if bit == "1":
+            acc = jac_add(acc, pt)
+    return acc
+
+def jac_batch_normalize(pts: list[JacobianPoint]) -> list[JacobianPoint]:
+    """
+    Normalize a list of points to Z = 1 with only one field inversion,
+    by Montgomery's trick.
+    """
+    p = BN128_FIELD_MODULUS
+    z_invs = batch_inverse([Z for _, _, Z in pts], p)
+    result = [JAC_ZERO] * len(pts)
+    for i, ((X, Y, Z), z_inv) in enumerate(zip(pts, z_invs)):
+        if Z == 0:
+            continue
+        z_inv2 = z_inv * z_inv % p
+        result[i] = (X * z_inv2 % p, Y * z_inv2 * z_inv % p, 1)
+    return result
+
+# GLV endomorphism of BN254 G1: phi(x, y) = (beta * x, y) = [lambda](x, y),
+#   where beta^3 = 1 in Fp and lambda^3 = 1 in Fr.
+#
+#   GLV: https://www.iacr.org/archive/crypto2001/21390189.pdf
+GLV_BETA = 2203960485148121921418603742825762020974279258880205651966
+GLV_LAMBDA = 4407920970296243842393367215006156084916469457145843978461
+
+# A reduced basis (a1, b1), (a2, b2) of the lattice {(a, b) | a + b * lambda = 0 mod r},
+#   with a1 * b2 - a2 * b1 = r
+GLV_A1 = 9931322734385697763
+GLV_B1 = -147946756881789319000765030803803410728
+GLV_A2 = 147946756881789319010696353538189108491
+GLV_B2 = 9931322734385697763
+
+# Width of the wNAF recoding in GLV scalar multiplication
+GLV_WNAF_WIDTH = 4
+
+def jac_endo(pt: JacobianPoint) -> JacobianPoint:
+    """
+    The endomorphism phi(X, Y, Z) = (beta * X, Y, Z).
+    """
+    X, Y, Z = pt
+    return (GLV_BETA * X % BN128_FIELD_MODULUS, Y, Z)
+
+def glv_decompose(k: int) -> tuple[int, int]:
+    """
+    Split a scalar k into k1 + k2 * lambda = k (mod r), with |k1|, |k2| < 2^128.
+    """
+    r = BN128_CURVE_ORDER
+    c1 = (2 * GLV_B2 * k + r) // (2 * r)
+    c2 = (-2 * GLV_B1 * k + r) // (2 * r)
+    k1 = k - c1 * GLV_A1 - c2 * GLV_A2
+    k2 = -c1 * GLV_B1 - c2 * GLV_B2
+    return k1, k2
+
+def wnaf(k: int, w: int) -> list[int]:
+    """
+    The width-w non-adjacent form of k >= 0, least significant digit first.
+    
+    Every non-zero digit is odd and lies in (-2^(w-1), 2^(w-1)), and any w 
+    consecutive digits contain at most one non-zero digit.
+    """
+    digits = []
+    while k > 0:
+        if k & 1:
+            d = k & ((1 << w) - 1)
+            if d >= 1 << (w - 1):
+                d -= 1 << w
+            k -= d
+        else:
+            d = 0
+        digits.append(d)
+        k >>= 1
+    return digits
+
+def jac_mul_glv(pt: JacobianPoint, k: int) -> JacobianPoint:
+    """
+    Scalar multiplication with the GLV endomorphism.
+
+        [k]P = [k1]P + [k2]phi(P)
+
+    The two ~127-bit halves are recoded in wNAF and processed together, 
+    sharing one chain of doublings.
+    """
+    k1, k2 = glv_decompose(k % BN128_CURVE_ORDER)
+
+    # Odd multiples P, 3P, 5P, ..., normalized for mixed additions
+    size = 1 << (GLV_WNAF_WIDTH - 2)
+    odd = [pt]
+    if size > 1:
+        dbl = jac_double(pt)
+        for _ in range(size - 1):
+            odd.append(jac_add(odd[-1], dbl))
+    odd = jac_batch_normalize(odd)
+
+    tables = []
+    nafs = []
+    for ki, endo in [(k1, False), (k2, True)]:
+        table = [jac_endo(q) for q in odd] if endo else odd
+        if ki < 0:
+            table = [jac_neg(q) for q in table]
+            ki = -ki
+        tables.append(table)
+        nafs.append(wnaf(ki, GLV_WNAF_WIDTH))
+
+    acc = JAC_ZERO
+    for i in reversed(range(max(len(nafs[0]), len(nafs[1])))):
+        acc = jac_double(acc)
+        for naf, table in zip(nafs, tables):
+            if i < len(naf) and naf[i] != 0:
+                d = naf[i]
+                if d > 0:
+                    acc = jac_add(acc, table[d >> 1])
+                else:
+                    acc = jac_add(acc, jac_neg(table[(-d) >> 1]))
+    return acc
+
 class G1Point:
+    __slots__ = ("jac",)
+
+    jac: JacobianPoint
+
     def __init__(self, x: Fp, y: Fp, is_zero: bool = False):
-        self.x = x
-        self.y = y
-        self.is_zero = is_zero
+        if is_zero:
+            self.jac = JAC_ZERO
+        else:
+            self.jac = (x.n, y.n, 1)
+
+    @classmethod
+    def from_jacobian(cls, jac: JacobianPoint) -> "G1Point":
+        pt = cls.__new__(cls)
+        pt.jac = jac
+        return pt
     
     @classmethod
     def ec_gen_group1(cls) -> "G1Point":
         return cls(bn128.G1[0], bn128.G1[1])
 
+    @property
+    def is_zero(self) -> bool:
+        return self.jac[2] == 0
+
+    def normalize(self) -> "G1Point":
+        """
+        Bring the point to Z = 1 in place (one field inversion).
+        """
+        Z = self.jac[2]
+        if Z == 0:
+            self.jac = JAC_ZERO
+        elif Z != 1:
+            self.jac = jac_batch_normalize([self.jac])[0]
+        return self
+
+    @classmethod
+    def batch_normalize(cls, pts: list["G1Point"]) -> list["G1Point"]:
+        """
+        Bring all the points to Z = 1 in place, sharing one field inversion.
+        """
+        todo = [pt for pt in pts if pt.jac[2] != 0 and pt.jac[2] != 1]
+        if len(todo) > 0:
+            for pt, jac in zip(todo, jac_batch_normalize([pt.jac for pt in todo])):
+                pt.jac = jac
+        return pts
+
+    @property
+    def x(self) -> Fp:
+        if self.is_zero:
+            return bn128.Z1
+        return bn128.FQ(self.normalize().jac[0])
+
+    @property
+    def y(self) -> Fp:
+        if self.is_zero:
+            return bn128.Z1
+        return bn128.FQ(self.normalize().jac[1])
+
     def __eq__(self, other: "G1Point") -> bool:
-        if self.is_zero and other.is_zero:
-            return True
-        elif not self.is_zero and not other.is_zero:
-            return self.x == other.x and self.y == other.y
-        return False
+        X1, Y1, Z1 = self.jac
+        X2, Y2, Z2 = other.jac
+        if Z1 == 0 or Z2 == 0:
+            return Z1 == Z2
+        p = BN128_FIELD_MODULUS
+        Z1Z1 = Z1 * Z1 % p
+        Z2Z2 = Z2 * Z2 % p
+        return (X1 * Z2Z2 - X2 * Z1Z1) % p == 0 \
+            and (Y1 * Z2Z2 * Z2 - Y2 * Z1Z1 * Z1) % p == 0
 
     def __add__(self, other: "G1Point") -> "G1Point":
-        if self.is_zero:
-            return other
-        if other.is_zero:
-            return self
-        result = bn128.add((self.x, self.y), (other.x, other.y))
-        return G1Point(result[0], result[1])
+        return G1Point.from_jacobian(jac_add(self.jac, other.jac))
+
+    def __neg__(self) -> "G1Point":
+        return G1Point.from_jacobian(jac_neg(self.jac))
 
     def __sub__(self, other: "G1Point") -> "G1Point":
-        if self == G1Point.zero():
-            return other
-        if other == G1Point.zero():
-            return self
-        result = bn128.add((self.x, self.y), bn128.neg((other.x, other.y)))
-        return G1Point(result[0], result[1])
+        return G1Point.from_jacobian(jac_add(self.jac, jac_neg(other.jac)))
     
     # def __mul__(self, other: Fr) -> "G1Point":
     #     return ec_mul(self, other)
@@ -84,6 +471,45 @@ class G1Point:
     # def __rmul__(self, other: Fr) -> "G1Point":
     #     return ec_mul(self, other)
 
+    # Flags in the top bits of the compressed encoding, which the 254-bit
+    #   x-coordinate leaves free
+    COMPRESSED_Y_FLAG = 0x80
+    COMPRESSED_ZERO_FLAG = 0x40
+
+    def to_bytes(self) -> bytes:
+        """
+        The 32-byte compressed encoding: x big-endian, with the top bit set
+        if y is the larger of y and -y, and the next bit set for zero.
+        """
+        X, Y, Z = self.normalize().jac
+        if Z == 0:
+            return bytes([self.COMPRESSED_ZERO_FLAG]) + bytes(31)
+        b = bytearray(X.to_bytes(32, "big"))
+        if Y > BN128_FIELD_MODULUS - Y:
+            b[0] |= self.COMPRESSED_Y_FLAG
+        return bytes(b)
+
+    @classmethod
+    def from_bytes(cls, b: bytes) -> "G1Point":
+        """
+        Decode the compressed encoding of to_bytes.
+        """
+        assert len(b) == 32, f"a compressed point must have 32 bytes, but got {len(b)}"
+        if b[0] & cls.COMPRESSED_ZERO_FLAG:
+            return cls.zero()
+        p = BN128_FIELD_MODULUS
+        X = int.from_bytes(bytes([b[0] & 0x3f]) + b[1:], "big")
+        if X >= p:
+            raise ValueError("the x-coordinate is not in the field")
+        Y2 = (X * X * X + 3) % p
+        # p = 3 mod 4
+        Y = pow(Y2, (p + 1) // 4, p)
+        if Y * Y % p != Y2:
+            raise ValueError("the point is not on the curve")
+        if (Y > p - Y) != bool(b[0] & cls.COMPRESSED_Y_FLAG):
+            Y = p - Y
+        return cls.from_jacobian((X, Y, 1))
+
     def __str__(self) -> str:
         return f"({self.x}, {self.y})"
     
@@ -91,7 +517,7 @@ class G1Point:
         return f"G1Point({self.x}, {self.y})"
     
     def __hash__(self) -> int:
-        return hash((self.x, self.y))
+        return hash(self.normalize().jac)
     
     def zero() -> "G1Point":
         return G1Point(bn128.Z1, bn128.Z1, is_zero=True)
@@ -104,8 +530,158 @@ def ec_mul(pt: G1Point, coeff: Fr) -> G1Point:
         return G1Point.zero()
     if coeff == Fr.zero():
         return G1Point.zero()
-    h = bn128.multiply((pt.x, pt.y), coeff.n)
-    return G1Point(h[0], h[1])
+    return G1Point.from_jacobian(jac_mul_glv(pt.jac, coeff.n))
+
+# Number of bits in a scalar of Fr
+SCALAR_BITS = BN128_CURVE_ORDER.bit_length()
+
+def msm_window_size(n: int, bits: int = SCALAR_BITS) -> int:
+    """
+    Pick the window size c of the bucket method for an MSM of length n.
+
+    Each of the ceil(b/c) windows costs n bucket additions plus about 2^(c+1)
+    additions to aggregate the buckets, so we take the c minimizing
+    
+        ceil(b/c) * (n + 2^(c+1))
+
+    where b is the bit length of the scalars.
+    """
+    best_c, best_cost = 1, None
+    for c in range(1, 17):
+        cost = -(-bits // c) * (n + (1 << (c + 1)))
+        if best_cost is None or cost < best_cost:
+            best_c, best_cost = c, cost
+    return best_c
+
+def ec_msm(pts: list[G1Point], coeffs: list[Fr]) -> G1Point:
+    """
+    Multi-scalar multiplication by the bucket method (Pippenger).
+
+        [c0]P0 + [c1]P1 + ... + [c_{n-1}]P_{n-1}
+
+    The scalars are cut into c-bit windows. For every window, each point is
+    dropped into the bucket of its digit, and the buckets are summed up with
+    a running sum, so that bucket d is counted d times.
+
+    The input points are normalized in place first, so that every bucket 
+    addition is a mixed (Jacobian + affine) addition. Each scalar is split 
+    by GLV into two ~127-bit halves over P and phi(P), which halves the 
+    number of windows, and so the doublings and bucket aggregations.
+
+    Args:
+        pts: the points P0, P1, ..., P_{n-1}
+        coeffs: the scalars c0, c1, ..., c_{n-1}
+    Returns:
+        the sum of [ci]Pi
+    """
+    assert len(pts) == len(coeffs), f"len(pts): {len(pts)} != len(coeffs): {len(coeffs)}"
+    pairs = [(pt, coeff.n) for pt, coeff in zip(pts, coeffs) if not pt.is_zero and coeff.n != 0]
+    if len(pairs) == 0:
+        return G1Point.zero()
+    if len(pairs) == 1:
+        return ec_mul(pairs[0][0], Fr(pairs[0][1]))
+    G1Point.batch_normalize([pt for pt, _ in pairs])
+    glv_pairs = []
+    for pt, k in pairs:
+        k1, k2 = glv_decompose(k)
+        for q, ki in [(pt.jac, k1), (jac_endo(pt.jac), k2)]:
+            if ki < 0:
+                glv_pairs.append((jac_neg(q), -ki))
+            elif ki > 0:
+                glv_pairs.append((q, ki))
+    pairs = glv_pairs
+
+    num_bits = max(k for _, k in pairs).bit_length()
+    c = msm_window_size(len(pairs), num_bits)
+    mask = (1 << c) - 1
+    num_windows = -(-num_bits // c)
+
+    acc = JAC_ZERO
+    for w in reversed(range(num_windows)):
+        for _ in range(c):
+            acc = jac_double(acc)
+        buckets = [JAC_ZERO] * mask
+        shift = w * c
+        for pt, k in pairs:
+            d = (k >> shift) & mask
+            if d != 0:
+                buckets[d - 1] = jac_add(buckets[d - 1], pt)
+        running = JAC_ZERO
+        total = JAC_ZERO
+        for bucket in reversed(buckets):
+            running = jac_add(running, bucket)
+            total = jac_add(total, running)
+        acc = jac_add(acc, total)
+    return G1Point.from_jacobian(acc)
+
+class FixedBaseTable:
+    """
+    Precomputed multiples of a fixed base point P:
+
+        table[i][d-1] = [d * 2^(w*i)]P,   for d in 1..2^w-1, i in 0..ceil(b/w)-1
+
+    With the table, [k]P is the sum of one entry per w-bit window of k, so a
+    fixed-base multiplication needs only ceil(b/w) additions and no doubling.
+    The entries are kept normalized, so that every addition is mixed.
+    """
+
+    # Approximate memory of one normalized entry: two 254-bit ints, a 3-tuple
+    # and a list slot
+    ENTRY_BYTES = 192
+
+    window: int
+    table: list[list[JacobianPoint]]
+
+    def __init__(self, pt: G1Point, window: int = 4):
+        assert not pt.is_zero, "the base point must not be zero"
+        self.window = window
+        num_windows = -(-SCALAR_BITS // window)
+        entries = []
+        base = pt.jac
+        for _ in range(num_windows):
+            row = [base]
+            for _ in range((1 << window) - 2):
+                row.append(jac_add(row[-1], base))
+            entries += row
+            base = jac_add(row[-1], base)
+        entries = jac_batch_normalize(entries)
+        size = (1 << window) - 1
+        self.table = [entries[i * size:(i + 1) * size] for i in range(num_windows)]
+
+    @classmethod
+    def nbytes(cls, window: int) -> int:
+        """
+        Estimated memory of a table with the given window size.
+        """
+        return -(-SCALAR_BITS // window) * ((1 << window) - 1) * cls.ENTRY_BYTES
+
+    def accumulate(self, acc: JacobianPoint, k: int) -> JacobianPoint:
+        """
+        Add [k]P to the accumulator acc.
+        """
+        w = self.window
+        mask = (1 << w) - 1
+        for row in self.table:
+            d = k & mask
+            if d != 0:
+                acc = jac_add(acc, row[d - 1])
+            k >>= w
+            if k == 0:
+                break
+        return acc
+
+    def mul(self, coeff: Fr) -> G1Point:
+        return G1Point.from_jacobian(self.accumulate(JAC_ZERO, coeff.n))
+
+def ec_fixed_base_msm(tables: list[FixedBaseTable], coeffs: list[Fr]) -> G1Point:
+    """
+    Multi-scalar multiplication over fixed bases with precomputed tables.
+    """
+    assert len(tables) == len(coeffs), f"len(tables): {len(tables)} != len(coeffs): {len(coeffs)}"
+    acc = JAC_ZERO
+    for table, coeff in zip(tables, coeffs):
+        acc = table.accumulate(acc, coeff.n)
+    return G1Point.from_jacobian(acc)
 
 def ec_gen_group2() -> G2Point:
     return bn128.G2
@@ -116,10 +692,7 @@ def ec_id_group2() -> G2Point:
     return b.Z2
 
 def ec_lincomb(pairs: list[tuple[G1Point, Fr]]) -> G1Point:
-    o = bn128.Z1
-    for pt, coeff in pairs:
-        o = bn128.add(o, ec_mul(pt, coeff))
-    return o
+    return ec_msm([pt for pt, _ in pairs], [coeff for _, coeff in pairs])
 
 # def poly_test():
 
@@ -142,6 +715,91 @@ def ec_lincomb(pairs: list[tuple[G1Point, Fr]]) -> G1Point:
 #     print("quo: ", quo.values)
 
 
+def test_fr():
+    rng = Random("test-fr")
+    r = Fr.field_modulus
+    a, b = Fr.rands(rng, 2)
+    assert not hasattr(a, "__dict__") and not hasattr(G1Point.ec_gen_group1(), "__dict__")
+    assert (a + b).n == (a.n + b.n) % r and (a - b).n == (a.n - b.n) % r and (a * b).n == a.n * b.n % r
+    assert a + 3 == 3 + a and (2 - a).n == (2 - a.n) % r and 5 * a == a * 5
+    assert a / b * b == a and 1 / a == a.inv() and a ** -2 == (a * a).inv()
+    assert a ** 0 == 1 and a ** 3 == a * a * a and -a + a == Fr.zero() and Fr(-1) == r - 1
+    assert sum([a, b]) == a + b and Fr(a) == a and Fr(3) != 4 and Fr.one() == 1
+    assert str(Fr(-2)) == "-2" and repr(Fr(-2)) == repr(r - 2)
+    print("✅ Fr Test Passed")
+
+def test_batch_inv():
+    rng = Random("test-batch-inv")
+    xs = Fr.rands(rng, 10) + [Fr(0), Fr(1)]
+    assert Fr.batch_inv(xs) == [x.inv() for x in xs]
+    assert Fr.batch_inv([]) == []
+    print("✅ Fr.batch_inv Test Passed")
+
+def test_g1_jacobian():
+    rng = Random("test-g1-jacobian")
+    g = G1Point.ec_gen_group1()
+    a, b = Fr.rand(rng), Fr.rand(rng)
+    pa, pb = ec_mul(g, a), ec_mul(g, b)
+    expected = bn128.add(bn128.multiply(bn128.G1, a.n), bn128.multiply(bn128.G1, b.n))
+    assert (pa + pb).x == expected[0] and (pa + pb).y == expected[1]
+    assert pa + pa == ec_mul(g, a + a)
+    assert pa - pb + pb == pa
+    assert pa - pa == G1Point.zero()
+    assert hash(pa + pb) == hash(ec_mul(g, a + b))
+    pts = [ec_mul(g, Fr(i)) + g for i in range(5)]
+    G1Point.batch_normalize(pts)
+    assert all(pt.jac[2] == 1 for pt in pts)
+    assert pts[3] == ec_mul(g, Fr(4))
+    print("✅ G1Point Jacobian Test Passed")
+
+def test_g1_compression():
+    rng = Random("test-g1-compression")
+    g = G1Point.ec_gen_group1()
+    for pt in [g, -g, G1Point.zero()] + [ec_mul(g, Fr.rand(rng)) for _ in range(8)]:
+        b = pt.to_bytes()
+        assert len(b) == 32 and G1Point.from_bytes(b) == pt
+    assert g.to_bytes() != (-g).to_bytes()
+    assert Fr(-1).to_bytes() == (Fr.field_modulus - 1).to_bytes(32, "big")
+    print("✅ G1Point compression Test Passed")
+
+def test_glv():
+    rng = Random("test-glv")
+    g = G1Point.ec_gen_group1()
+    assert G1Point.from_jacobian(jac_endo(g.jac)) == G1Point.from_jacobian(jac_mul(g.jac, GLV_LAMBDA))
+    r = BN128_CURVE_ORDER
+    for k in [1, 2, 3, GLV_LAMBDA, r - 1] + [rng.randint(1, r - 1) for _ in range(20)]:
+        k1, k2 = glv_decompose(k)
+        assert (k1 + k2 * GLV_LAMBDA - k) % r == 0
+        assert abs(k1).bit_length() <= 128 and abs(k2).bit_length() <= 128
+        assert sum(d << i for i, d in enumerate(wnaf(k, GLV_WNAF_WIDTH))) == k
+        assert G1Point.from_jacobian(jac_mul_glv(g.jac, k)) == G1Point.from_jacobian(jac_mul(g.jac, k))
+    print("✅ GLV Test Passed")
+
+def test_ec_msm():
+    rng = Random("test-ec-msm")
+    g = G1Point.ec_gen_group1()
+    for n in [0, 1, 2, 5, 33]:
+        pts = [ec_mul(g, Fr.rand(rng)) for _ in range(n)]
+        coeffs = Fr.rands(rng, n)
+        expected = G1Point.zero()
+        for pt, coeff in zip(pts, coeffs):
+            expected = expected + ec_mul(pt, coeff)
+        assert ec_msm(pts, coeffs) == expected, f"ec_msm failed for n={n}"
+    print("✅ ec_msm Test Passed")
+
+def test_fixed_base_table():
+    rng = Random("test-fixed-base-table")
+    g = G1Point.ec_gen_group1()
+    pts = [ec_mul(g, Fr.rand(rng)) for _ in range(3)]
+    tables = [FixedBaseTable(pt, window) for pt, window in zip(pts, [1, 4, 5])]
+    coeffs = Fr.rands(rng, 3) 
+    for pt, table, coeff in zip(pts, tables, coeffs):
+        assert table.mul(coeff) == ec_mul(pt, coeff)
+        assert table.mul(Fr(-1)) == -pt
+        assert table.mul(Fr(0)) == G1Point.zero()
+    assert ec_fixed_base_msm(tables, coeffs) == ec_msm(pts, coeffs)
+    print("✅ FixedBaseTable Test Passed")
+
 if __name__ == "__main__":
     print(f"type(b.G1): {type(bn128.G1)}")
     print(f"type(b.Z1): {type(bn128.Z1)}")
@@ -164,3 +822,10 @@ if __name__ == "__main__":
     print(f"b: {b}")
     print(f"b.G1.double(): {bn128.double(bn128.G1)}")
 
+    test_fr()
+    test_batch_inv()
+    test_g1_jacobian()
+    test_g1_compression()
+    test_glv()
+    test_ec_msm()
+    test_fixed_base_table()
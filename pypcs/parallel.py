@@ -0,0 +1,113 @@
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Optional
+
+from pypcs.curve import Fr, G1Point, JacobianPoint, JAC_ZERO, jac_add, jac_mul_glv, ec_msm
+
+# NOTE: Work is shipped to the worker processes as Jacobian tuples and raw
+#   integers, which are much cheaper to pickle than G1Point and Fr objects.
+
+def _msm_chunk(pts: list[JacobianPoint], ks: list[int]) -> JacobianPoint:
+    return ec_msm([G1Point.from_jacobian(pt) for pt in pts], [Fr(k) for k in ks]).jac
+
+def _fold_chunk(pts1: list[JacobianPoint], pts2: list[JacobianPoint], k: int) -> list[JacobianPoint]:
+    return [jac_add(p1, jac_mul_glv(p2, k)) for p1, p2 in zip(pts1, pts2)]
+
+def chunk_ranges(n: int, num_chunks: int, min_chunk: int) -> list[tuple[int, int]]:
+    """
+    Split range(n) into at most num_chunks contiguous ranges of at least
+    min_chunk elements (except when n itself is smaller), and no range for
+    n = 0.
+    """
+    if n == 0:
+        return []
+    num_chunks = max(1, min(num_chunks, n // max(min_chunk, 1)))
+    size = -(-n // num_chunks)
+    return [(i, min(i + size, n)) for i in range(0, n, size)]
+
+class WorkerPool:
+    """
+    A process pool for the MSMs and generator folds of the IPA provers.
+
+    With workers=None or workers=1, everything runs in the current process.
+    The processes are only started on the first piece of work large enough
+    to be split, i.e. at least 2 * min_chunk elements.
+    """
+
+    workers: int
+    min_chunk: int
+    executor: Optional[ProcessPoolExecutor]
+
+    def __init__(self, workers: Optional[int] = None, min_chunk: int = 64):
+        """
+        Args:
+            workers: the number of worker processes
+            min_chunk: the minimum number of elements sent to a worker
+        """
+        self.workers = workers if workers is not None else 1
+        self.min_chunk = min_chunk
+        self.executor = None
+
+    def is_parallel(self, n: int) -> bool:
+        return self.workers > 1 and n >= 2 * self.min_chunk
+
+    def get_executor(self) -> ProcessPoolExecutor:
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self.executor
+
+    def msms(self, instances: list[tuple[list[G1Point], list[Fr]]]) -> list[G1Point]:
+        """
+        Compute several independent MSMs, with the chunks of all of them
+        spread over the pool together.
+        """
+        if not any(self.is_parallel(len(pts)) for pts, _ in instances):
+            return [ec_msm(pts, coeffs) for pts, coeffs in instances]
+
+        executor = self.get_executor()
+        futures = []
+        for pts, coeffs in instances:
+            assert len(pts) == len(coeffs), f"len(pts): {len(pts)} != len(coeffs): {len(coeffs)}"
+            G1Point.batch_normalize(pts)
+            futures.append([
+                executor.submit(_msm_chunk, [pt.jac for pt in pts[i:j]], [coeff.n for coeff in coeffs[i:j]])
+                for i, j in chunk_ranges(len(pts), self.workers, self.min_chunk)])
+        results = []
+        for chunks in futures:
+            acc = JAC_ZERO
+            for future in chunks:
+                acc = jac_add(acc, future.result())
+            results.append(G1Point.from_jacobian(acc))
+        return results
+
+    def submit_msm(self, pts: list[G1Point], coeffs: list[Fr]) -> Future:
+        """
+        Submit a whole MSM as one task of the pool.
+
+        Returns:
+            a future of the result in Jacobian coordinates
+        """
+        G1Point.batch_normalize(pts)
+        return self.get_executor().submit(_msm_chunk, [pt.jac for pt in pts], [coeff.n for coeff in coeffs])
+
+    def msm(self, pts: list[G1Point], coeffs: list[Fr]) -> G1Point:
+        return self.msms([(pts, coeffs)])[0]
+
+    def fold(self, G: list[G1Point], half: int, mu_inv: Fr) -> list[G1Point]:
+        """
+        Fold a vector of generators:
+
+            G'[i] = G[i] + [mu_inv]G[half + i],   for i in 0..half-1
+        """
+        if not self.is_parallel(half):
+            return [G1Point.from_jacobian(jac) for jac in
+                    _fold_chunk([pt.jac for pt in G[:half]], [pt.jac for pt in G[half:2 * half]], mu_inv.n)]
+
+        executor = self.get_executor()
+        futures = [executor.submit(_fold_chunk, [pt.jac for pt in G[i:j]], [pt.jac for pt in G[half + i:half + j]], mu_inv.n)
+                   for i, j in chunk_ranges(half, self.workers, self.min_chunk)]
+        return [G1Point.from_jacobian(jac) for future in futures for jac in future.result()]
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
@@ -0,0 +1,159 @@
+from typing import Iterable, Iterator
+
+from pypcs.curve import Fr
+
+class FrVector:
+    """
+    A vector over Fr, stored as a flat list of raw residues in [0, r).
+
+    The elementwise operations work on the residues directly, so no Fr object
+    is created per element. Indexing returns an Fr, and slicing an FrVector.
+
+    NOTE: str(FrVector(vs)) is the same as str(vs) for a list of Fr, so it
+    can replace a list in transcript messages.
+    """
+
+    ns: list[int]
+
+    def __init__(self, vs: Iterable[Fr | int] = ()):
+        r = Fr.field_modulus
+        if isinstance(vs, FrVector):
+            self.ns = vs.ns.copy()
+        else:
+            self.ns = [int(v) % r for v in vs]
+
+    @classmethod
+    def from_residues(cls, ns: list[int]) -> "FrVector":
+        """
+        Wrap a list of residues in [0, r), without copying or reducing it.
+        """
+        v = cls.__new__(cls)
+        v.ns = ns
+        return v
+
+    @classmethod
+    def zeros(cls, n: int) -> "FrVector":
+        return cls.from_residues([0] * n)
+
+    def to_list(self) -> list[Fr]:
+        return [Fr(x) for x in self.ns]
+
+    def __len__(self) -> int:
+        return len(self.ns)
+
+    def __iter__(self) -> Iterator[Fr]:
+        return (Fr(x) for x in self.ns)
+
+    def __getitem__(self, index: int | slice) -> "Fr | FrVector":
+        if isinstance(index, slice):
+            return FrVector.from_residues(self.ns[index])
+        return Fr(self.ns[index])
+
+    def __setitem__(self, index: int, v: Fr | int):
+        self.ns[index] = int(v) % Fr.field_modulus
+
+    def __eq__(self, other: "FrVector | list[Fr]") -> bool:
+        if not isinstance(other, FrVector):
+            other = FrVector(other)
+        return self.ns == other.ns
+
+    def __str__(self) -> str:
+        return str(self.ns)
+
+    def __repr__(self) -> str:
+        return f"FrVector({self.ns})"
+
+    @staticmethod
+    def residues(vs: "FrVector | list[Fr]") -> list[int]:
+        if isinstance(vs, FrVector):
+            return vs.ns
+        return [int(v) for v in vs]
+
+    def __add__(self, other: "FrVector | list[Fr]") -> "FrVector":
+        ns = FrVector.residues(other)
+        assert len(ns) == len(self.ns), f"length mismatch: {len(self.ns)} != {len(ns)}"
+        r = Fr.field_modulus
+        return FrVector.from_residues([(a + b) % r for a, b in zip(self.ns, ns)])
+
+    def __sub__(self, other: "FrVector | list[Fr]") -> "FrVector":
+        ns = FrVector.residues(other)
+        assert len(ns) == len(self.ns), f"length mismatch: {len(self.ns)} != {len(ns)}"
+        r = Fr.field_modulus
+        return FrVector.from_residues([(a - b) % r for a, b in zip(self.ns, ns)])
+
+    def __neg__(self) -> "FrVector":
+        r = Fr.field_modulus
+        return FrVector.from_residues([(-a) % r for a in self.ns])
+
+    def __mul__(self, other: "FrVector | list[Fr] | Fr | int") -> "FrVector":
+        """
+        Elementwise product with a vector, or product with a scalar.
+        """
+        r = Fr.field_modulus
+        if isinstance(other, (Fr, int)):
+            c = int(other)
+            return FrVector.from_residues([a * c % r for a in self.ns])
+        ns = FrVector.residues(other)
+        assert len(ns) == len(self.ns), f"length mismatch: {len(self.ns)} != {len(ns)}"
+        return FrVector.from_residues([a * b % r for a, b in zip(self.ns, ns)])
+
+    def __rmul__(self, other: Fr | int) -> "FrVector":
+        return self * other
+
+    def dot(self, other: "FrVector | list[Fr]") -> Fr:
+        """
+        The inner product, reduced once at the end.
+        """
+        ns = FrVector.residues(other)
+        assert len(ns) == len(self.ns), f"length mismatch: {len(self.ns)} != {len(ns)}"
+        return Fr(sum(a * b for a, b in zip(self.ns, ns)))
+
+    def fold(self, mu: Fr | int, inplace: bool = False) -> "FrVector":
+        """
+        Fold the two halves of the vector with a challenge:
+
+            v'[i] = v[i] + mu * v[half + i],   for i in 0..half-1
+
+        With inplace=True, the result is written over the first half and the
+        second half is released.
+        """
+        r = Fr.field_modulus
+        c = int(mu)
+        ns = self.ns
+        half = len(ns) // 2
+        if not inplace:
+            return FrVector.from_residues([(ns[i] + c * ns[half + i]) % r for i in range(half)])
+        for i in range(half):
+            ns[i] = (ns[i] + c * ns[half + i]) % r
+        del ns[half:]
+        return self
+
+def inner_product(vec_a: FrVector | list[Fr], vec_b: FrVector | list[Fr]) -> Fr:
+    """
+    The inner product of two vectors over Fr, accumulated over raw residues.
+    """
+    assert len(vec_a) == len(vec_b), f"length mismatch: {len(vec_a)} != {len(vec_b)}"
+    return Fr(sum(a * b for a, b in zip(FrVector.residues(vec_a), FrVector.residues(vec_b))))
+
+def test_fr_vector():
+    from random import Random
+    rng = Random("test-fr-vector")
+    xs = Fr.rands(rng, 8)
+    ys = Fr.rands(rng, 8)
+    mu = Fr.rand(rng)
+    vx, vy = FrVector(xs), FrVector(ys)
+    assert str(vx) == str(xs)
+    assert vx + vy == [x + y for x, y in zip(xs, ys)]
+    assert vx - vy == [x - y for x, y in zip(xs, ys)]
+    assert vx * vy == [x * y for x, y in zip(xs, ys)]
+    assert vx * mu == mu * vx == [x * mu for x in xs]
+    assert -vx == [-x for x in xs]
+    assert vx.dot(vy) == inner_product(xs, ys) == sum(x * y for x, y in zip(xs, ys))
+    assert vx[2] == xs[2] and vx[1:5] == xs[1:5] and vx[::2] == xs[::2]
+    folded = [xs[i] + mu * xs[4 + i] for i in range(4)]
+    assert vx.fold(mu) == folded
+    assert vx.fold(mu, inplace=True) is vx and vx == folded
+    print("✅ FrVector Test Passed")
+
+if __name__ == "__main__":
+    test_fr_vector()
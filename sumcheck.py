@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+
+# WARNING: This implementation may contain bugs and has not been audited.
+# It is only for educational purposes. DO NOT use it in production.
+
+from pypcs.curve import Fr
+from merlin.merlin_transcript import MerlinTranscript
+
+from mle import MLEPolynomial
+from pypcs.vector import FrVector
+
+# WARNING:
+#   With a TRANSCRIPT_V1 transcript, challenges are only 1 byte long, which
+#   is not secure.
+
+import random
+
+# Implementation of the sumcheck protocol for products of MLEs:
+#
+#   sum_{x in {0,1}^k} f_0(x) * f_1(x) * ... * f_{d-1}(x) = c,   d <= 4
+#
+# The prover is the linear-time one from Section 3 in [Tha13], which keeps
+# a table of evaluations for each f_j over the remaining hypercube and
+# folds all of them with the challenge of each round:
+#
+#   Tha13: https://eprint.iacr.org/2013/351.pdf
+#
+# The variables are bound from X_0 (the lowest bit of the index of the
+# evaluations) to X_{k-1}, so the final point (r_0, ..., r_{k-1}) can be
+# passed to MLEPolynomial.evaluate as it is.
+#
+# Several claims over the same number of variables are proven together by
+# a random linear combination of them, with one combiner per claim drawn
+# from the transcript.
+
+# TODO:
+# - add zero-knowledge by masking polynomials
+
+MAX_DEGREE = 4
+
+# The round polynomials (as their evaluations at 0, 1, ..., d), and the
+# evaluations of every factor of every claim at the final point
+Sumcheck_Argument = tuple[list[list[Fr]], list[list[Fr]]]
+
+class Sumcheck:
+
+    debug: bool
+
+    def __init__(self, debug: bool = False):
+        self.debug = debug
+
+    def prove(self, claims: list[list[MLEPolynomial]], sums: list[Fr], tr: MerlinTranscript) \
+            -> tuple[Sumcheck_Argument, list[Fr]]:
+        """
+        Prove that sum_x f_{i,0}(x) * ... * f_{i,d_i-1}(x) = sums[i] for
+        every claim i.
+
+        Args:
+            claims: the factors f_{i,0}, ..., f_{i,d_i-1} of each claim
+            sums: the claimed sums
+            tr: the Merlin transcript to use for the proof
+        Returns:
+            the Sumcheck_Argument, and the final point (r_0, ..., r_{k-1})
+        """
+        assert len(claims) == len(sums) > 0, f"EROR: {len(claims)} claims, while {len(sums)} sums"
+        assert all(0 < len(factors) <= MAX_DEGREE for factors in claims), \
+            f"EROR: every claim must have 1 to {MAX_DEGREE} factors"
+        num_var = claims[0][0].num_var
+        assert all(f.num_var == num_var for factors in claims for f in factors), \
+            "EROR: all the MLEs must have the same number of variables"
+        degree = max(len(factors) for factors in claims)
+        p = Fr.field_modulus
+
+        alphas = self.combiners(tr, num_var, [len(factors) for factors in claims], sums)
+
+        # The bookkeeping tables, as raw residues (copies of the evaluations)
+        tables = [[FrVector(f.evals).ns for f in factors] for factors in claims]
+
+        round_polys = []
+        rs = []
+        half = 1 << num_var
+        for _ in range(num_var):
+            half >>= 1
+
+            # Round i:   g_i(0), g_i(1), ..., g_i(d) ->
+            acc = [0] * (degree + 1)
+            for alpha, factors in zip(alphas, tables):
+                alpha = alpha.n
+                for x, s in enumerate(round_sums(factors, half, degree)):
+                    acc[x] += alpha * s
+            g = [Fr(a) for a in acc]
+            round_polys.append(g)
+            tr.append_scalars(b"g", g)
+
+            # Round i:   r_i <~ Fr
+            r = tr.challenge_scalar(b"r")
+            if self.debug:
+                print(f"prove> g: {g}, r: {r}")
+            rs.append(r)
+
+            r = r.n
+            for factors in tables:
+                for t in factors:
+                    for j in range(half):
+                        e = t[2*j]
+                        t[j] = (e + r * (t[2*j+1] - e)) % p
+                    del t[half:]
+
+        # Final round:   f_{i,j}(r_0, ..., r_{k-1}) ->
+        evals = [[Fr(t[0]) for t in factors] for factors in tables]
+        tr.append_scalars(b"evals", [e for es in evals for e in es])
+
+        return (round_polys, evals), rs
+
+    def verify(self, num_var: int, degrees: list[int], sums: list[Fr], arg: Sumcheck_Argument,
+            tr: MerlinTranscript) -> tuple[bool, list[Fr]]:
+        """
+        Verify a sumcheck argument.
+
+        The final evaluations in the argument are only checked against the
+        round polynomials: the caller still has to check them against the
+        commitments to the MLEs, at the returned point.
+
+        Args:
+            num_var: the number of variables of the MLEs
+            degrees: the number of factors of each claim
+            sums: the claimed sums
+            arg: the Sumcheck_Argument (proof transcript)
+            tr: the Merlin transcript to use for the proof
+        Returns:
+            whether the argument is valid, and the final point (r_0, ..., r_{k-1})
+        """
+        round_polys, evals = arg
+        degree = max(degrees)
+        alphas = self.combiners(tr, num_var, degrees, sums)
+
+        rs = []
+        if len(round_polys) != num_var or [len(e) for e in evals] != list(degrees):
+            return False, rs
+
+        claim = sum(alpha * s for alpha, s in zip(alphas, sums))
+        for g in round_polys:
+            if len(g) != degree + 1:
+                return False, rs
+            if g[0] + g[1] != claim:
+                if self.debug:
+                    print(f"verify> g(0) + g(1) must be {claim}, but got {g[0] + g[1]}")
+                return False, rs
+            tr.append_scalars(b"g", g)
+            r = tr.challenge_scalar(b"r")
+            rs.append(r)
+            claim = interpolate_at(g, r)
+
+        tr.append_scalars(b"evals", [e for es in evals for e in es])
+        final = Fr.zero()
+        for alpha, es in zip(alphas, evals):
+            prod = alpha
+            for e in es:
+                prod *= e
+            final += prod
+        if self.debug and final != claim:
+            print(f"verify> the final evaluations must sum to {claim}, but got {final}")
+        return final == claim, rs
+
+    @staticmethod
+    def combiners(tr: MerlinTranscript, num_var: int, degrees: list[int], sums: list[Fr]) -> list[Fr]:
+        """
+        Append the statement to the transcript, and draw the combiners of
+        the claims (1 for a single claim).
+        """
+        tr.append_u64(b"num_var", num_var)
+        tr.append_u64(b"num_claims", len(degrees))
+        for d in degrees:
+            tr.append_u64(b"degree", d)
+        tr.append_scalars(b"sums", sums)
+        if len(sums) == 1:
+            return [Fr.one()]
+        return tr.challenge_scalars(b"alpha", len(sums))
+
+def round_sums(factors: list[list[int]], half: int, degree: int) -> list[int]:
+    """
+    Evaluate sum_x f_0(X, x) * ... * f_{d-1}(X, x) at X = 0, 1, ..., degree,
+    from the tables of the factors over residues.
+
+    Each f_j(X, x) is linear in X, so its value at X = t is 
+    f_j(0, x) + t * (f_j(1, x) - f_j(0, x)). The products are reduced, and 
+    the sums only once at the end.
+    """
+    p = Fr.field_modulus
+    acc = [0] * (degree + 1)
+    points = range(degree + 1)
+    for i in range(half):
+        prods = None
+        for t in factors:
+            e = t[2*i]
+            d = t[2*i+1] - e
+            vals = [e + x * d for x in points]
+            prods = vals if prods is None else [a * b % p for a, b in zip(prods, vals)]
+        for x in points:
+            acc[x] += prods[x]
+    return [a % p for a in acc]
+
+def lagrange_denominators(n: int) -> list[Fr]:
+    """
+    The inverses of the denominators prod_{j != i} (i - j) of the Lagrange 
+    basis over 0, 1, ..., n - 1, inverted together.
+    """
+    dens = []
+    for i in range(n):
+        den = Fr.one()
+        for j in range(n):
+            if j != i:
+                den *= i - j
+        dens.append(den)
+    return Fr.batch_inv(dens)
+
+LAGRANGE_DEN_INVS = [lagrange_denominators(n) for n in range(MAX_DEGREE + 2)]
+
+def interpolate_at(evals: list[Fr], r: Fr) -> Fr:
+    """
+    Evaluate the polynomial of degree < len(evals) with the given values at
+    0, 1, ..., len(evals) - 1 at the point r, by Lagrange interpolation.
+
+    The denominators only depend on len(evals), and their inverses are 
+    precomputed, so no field inversion is done here.
+    """
+    n = len(evals)
+    den_invs = LAGRANGE_DEN_INVS[n] if n < len(LAGRANGE_DEN_INVS) else lagrange_denominators(n)
+    result = Fr.zero()
+    for i in range(n):
+        num = Fr.one()
+        for j in range(n):
+            if j != i:
+                num *= r - j
+        result += evals[i] * num * den_invs[i]
+    return result
+
+def test_sumcheck():
+    rng = random.Random("test-sumcheck")
+    k = 4
+    fs = [MLEPolynomial(Fr.rands(rng, 1 << k), k) for _ in range(3)]
+    c = sum(fs[0][i] * fs[1][i] * fs[2][i] for i in range(1 << k))
+
+    tr = MerlinTranscript(b"sumcheck")
+    tr_prover = tr.fork(b"test")
+    tr_verifier = tr.fork(b"test")
+
+    sumcheck = Sumcheck()
+    arg, rs = sumcheck.prove([fs], [c], tr_prover)
+    verified, rs2 = sumcheck.verify(k, [3], [c], arg, tr_verifier)
+    assert verified and rs == rs2
+    assert arg[1][0] == [f.evaluate(rs) for f in fs]
+
+    verified, _ = sumcheck.verify(k, [3], [c + 1], arg, tr.fork(b"test"))
+    assert not verified
+    print("✅ Sumcheck Test Passed")
+
+def test_sumcheck_batch():
+    rng = random.Random("test-sumcheck-batch")
+    k = 3
+    claims = [[MLEPolynomial(Fr.rands(rng, 1 << k), k) for _ in range(d)] for d in [1, 2, 4]]
+    sums = []
+    for factors in claims:
+        s = Fr.zero()
+        for i in range(1 << k):
+            prod = Fr.one()
+            for f in factors:
+                prod *= f[i]
+            s += prod
+        sums.append(s)
+
+    tr = MerlinTranscript(b"sumcheck-batch")
+    sumcheck = Sumcheck()
+    arg, rs = sumcheck.prove(claims, sums, tr.fork(b"test"))
+    verified, rs2 = sumcheck.verify(k, [1, 2, 4], sums, arg, tr.fork(b"test"))
+    assert verified and rs == rs2
+    assert arg[1] == [[f.evaluate(rs) for f in factors] for factors in claims]
+
+    verified, _ = sumcheck.verify(k, [1, 2, 4], sums[:2] + [sums[2] + 1], arg, tr.fork(b"test"))
+    assert not verified
+    print("✅ Sumcheck batch Test Passed")
+
+def test_interpolate_at():
+    rng = random.Random("test-interpolate-at")
+    for n in range(1, MAX_DEGREE + 3):
+        coeffs = Fr.rands(rng, n)
+        poly = lambda x: sum(c * x**i for i, c in enumerate(coeffs))
+        r = Fr.rand(rng)
+        assert interpolate_at([poly(Fr(x)) for x in range(n)], r) == poly(r)
+    print("✅ interpolate_at Test Passed")
+
+if __name__ == "__main__":
+    test_sumcheck()
+    test_sumcheck_batch()
+    test_interpolate_at()